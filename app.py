@@ -4,39 +4,59 @@ Flask Webアプリケーション
 import os
 import sys
 import uuid
+import time
+import shutil
+import hashlib
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import eventlet
+import eventlet.event
+import eventlet.semaphore
+import eventlet.tpool
 
 # eventletをパッチ - 他のモジュールをインポートする前に実行
-eventlet.monkey_patch()
+# spawnで起動したinpaintワーカーは本ファイルを__mp_main__として再importするため、ワーカーではパッチしない
+# （サーバーの状態もワーカーでは作成しない）
+IS_INPAINT_WORKER = __name__ == '__mp_main__'
+if not IS_INPAINT_WORKER:
+    eventlet.monkey_patch()
 
 from flask import Flask, render_template, request, jsonify, send_from_directory
 from flask_socketio import SocketIO
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
-import threading
+from cachetools import TTLCache
+import cv2
+import numpy as np
 
 # srcディレクトリをパスに追加
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.ocr import TextExtractor
-from src.translation import GeminiTranslator
-from src.image_processing import TextInpainter
-from src.text_rendering import TextRenderer
 from src.file_management import FileManager
+from src.inpaint_worker import init_inpaint_worker, inpaint_and_render
 from dotenv import load_dotenv
 
+# フォームの言語指定をEasyOCRの言語コードに変換するためのマッピング（キーは小文字）
+_LANGUAGE_MAPPING = {
+    'chinese': 'ch_sim',
+    'zh': 'ch_sim',
+    'english': 'en',
+    'en': 'en'
+}
+
+# 英語と組み合わせる必要がある中国語の言語コード
+_CH_LANGS = frozenset(('ch_sim', 'ch_tra'))
+
 def adjust_ocr_languages(languages):
     """
     EasyOCRの制限に合わせて言語組み合わせを調整
     入力: 中国語または英語のみ
     """
-    # 中国語が含まれる場合は英語を追加
-    if any(lang in ['ch_sim', 'ch_tra'] for lang in languages):
-        if 'ch_sim' in languages:
-            return ['ch_sim', 'en']
-        elif 'ch_tra' in languages:
-            return ['ch_tra', 'en']
+    # 中国語が含まれる場合は英語を追加（ch_simを優先）
+    chinese = _CH_LANGS.intersection(languages)
+    if chinese:
+        return ['ch_sim' if 'ch_sim' in chinese else 'ch_tra', 'en']
 
     # 英語のみの場合
     if 'en' in languages:
@@ -53,113 +73,235 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB
 app.config['OUTPUT_FOLDER'] = 'output'
 
 # 許可されるファイル形式
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'bmp', 'tiff'}
+ALLOWED_EXTENSIONS = frozenset(('png', 'jpg', 'jpeg', 'bmp', 'tiff'))
+
+# 翻訳済みファイル名の接尾辞（出力ディレクトリ走査用）
+TRANSLATED_SUFFIXES = tuple(f'_translated.{ext}' for ext in ALLOWED_EXTENSIONS)
+
+# OCRのバッチサイズ
+OCR_BATCH_SIZE = int(os.getenv('OCR_BATCH_SIZE', '8'))
+
+# 翻訳結果のキャッシュ（FileManagerのメタデータと同じdbディレクトリに保存）
+TRANSLATION_CACHE_FILE = os.path.join('db', 'translation_cache.sqlite3')
 
 # SocketIOの設定
-socketio = SocketIO(app, cors_allowed_origins="*")
+socketio = SocketIO()
+if not IS_INPAINT_WORKER:
+    socketio.init_app(app, cors_allowed_origins="*")
 CORS(app)
 
 # ロギング設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class ProgressEmitter:
+    """進捗イベントをセッションごとに間引いて送信するクラス"""
+
+    def __init__(self, socketio, interval=0.1):
+        """
+        初期化
+
+        Args:
+            socketio: SocketIOインスタンス
+            interval: セッションごとの最小送信間隔（秒）
+        """
+        self.socketio = socketio
+        self.interval = interval
+        self.last_sent = {}
+        self.pending = {}
+        self._draining = False
+
+    def push(self, session_id, payload):
+        """進捗を送信（間隔内の場合は最新の進捗のみ保持して後で送信）"""
+        if session_id not in self.pending and time.monotonic() - self.last_sent.get(session_id, 0) >= self.interval:
+            self._send(session_id, payload)
+            return
+
+        self.pending[session_id] = payload
+        if not self._draining:
+            self._draining = True
+            self.socketio.start_background_task(self._drain)
+
+    def flush(self, session_id):
+        """保留中の進捗を即座に送信（完了・エラーイベントの前に呼び出す）"""
+        payload = self.pending.pop(session_id, None)
+        if payload is not None:
+            self._send(session_id, payload)
+
+    def close(self, session_id):
+        """保留中の進捗を送信し、セッションの送信記録を破棄"""
+        self.flush(session_id)
+        self.last_sent.pop(session_id, None)
+
+    def _send(self, session_id, payload):
+        self.last_sent[session_id] = time.monotonic()
+        self.socketio.emit('progress', payload)
+
+    def _drain(self):
+        """保留中の進捗を一定間隔で送信するバックグラウンドタスク"""
+        try:
+            while self.pending:
+                self.socketio.sleep(self.interval)
+                now = time.monotonic()
+                for session_id in list(self.pending):
+                    if now - self.last_sent.get(session_id, 0) >= self.interval:
+                        self.flush(session_id)
+        finally:
+            self._draining = False
+
+progress_emitter = ProgressEmitter(socketio)
+
 # 環境変数の読み込み
 load_dotenv()
 
 # ファイル管理の初期化
-file_manager = FileManager(base_dir='.', max_age_hours=24)
+file_manager = None if IS_INPAINT_WORKER else FileManager(base_dir='.', max_age_hours=24)
 
 # グローバル変数（セッション管理）
-processing_sessions = {}
+# ファイルマネージャーと同じ24時間で期限切れにし、長時間稼働時の肥大化を防ぐ
+processing_sessions = TTLCache(maxsize=1000, ttl=24 * 3600)
+
+# バックグラウンド処理のワーカープール（同時処理セッション数を制限）
+worker_pool = None if IS_INPAINT_WORKER else eventlet.GreenPool(size=int(os.getenv('MAX_CONCURRENT_SESSIONS', '2')))
+
+# 稼働中に古いファイルをクリーンアップする間隔（秒）
+CLEANUP_INTERVAL = int(os.getenv('CLEANUP_INTERVAL_SECONDS', '3600'))
+
+# アップロード保存時のバッファサイズ
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def save_upload(file, file_path):
+    """アップロードファイルをUPLOAD_CHUNK_SIZE単位でディスクに書き込む"""
+    with open(file_path, 'wb') as dst:
+        shutil.copyfileobj(file.stream, dst, length=UPLOAD_CHUNK_SIZE)
+
+def read_upload(file_path):
+    """アップロード済みファイルを1回だけ読み込み、(SHA-256, バイト列)を返す"""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    return hashlib.sha256(data).hexdigest(), data
+
+def decode_image(data):
+    """メモリ上のバイト列を画像にデコード"""
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
 
 def allowed_file(filename):
     """ファイル拡張子のチェック"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    _, dot, ext = filename.rpartition('.')
+    return bool(dot) and ext.lower() in ALLOWED_EXTENSIONS
+
+# テキスト除去・再描画用のワーカープロセス（初回使用時に作成）
+INPAINT_WORKERS = int(os.getenv('INPAINT_WORKERS', str(max(1, (os.cpu_count() or 2) // 2))))
+FONT_PATH = 'fonts/NotoSansJP-Regular.ttf'
+inpaint_executor = None
+
+def get_inpaint_executor():
+    """テキスト除去・再描画用のProcessPoolExecutorを取得"""
+    global inpaint_executor
+    if inpaint_executor is None:
+        # eventletのハブやスレッドをforkで複製しないようspawnで起動する
+        # spawnは本ファイルを__mp_main__として再importするため、サーバーの状態はIS_INPAINT_WORKERで作成を抑止している
+        inpaint_executor = ProcessPoolExecutor(
+            max_workers=INPAINT_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_inpaint_worker,
+            initargs=(FONT_PATH,)
+        )
+    return inpaint_executor
 
 class ImageTranslationPipeline:
-    """画像翻訳パイプライン"""
+    """
+    画像翻訳パイプライン
+
+    OCR言語とGPU設定ごとに共有されるため、セッション固有の設定（翻訳先言語など）は
+    各メソッドの引数で受け取る。
+    """
 
     def __init__(self, settings):
         self.settings = settings
         self.logger = logging.getLogger(__name__)
 
+        # OCR・翻訳の依存（EasyOCR/PyTorch・Gemini）はサーバープロセスでのみ読み込む
+        from src.ocr import TextExtractor
+        from src.translation import GeminiTranslator
+
         # 各コンポーネントの初期化
         self.text_extractor = TextExtractor(
             languages=settings['ocr_languages'],
             gpu=settings['use_gpu']
         )
-
-        self.translator = GeminiTranslator()
-
-        self.inpainter = TextInpainter(
-            method='ns',
-            inpaint_radius=3
-        )
-
-        self.renderer = TextRenderer(
-            font_path='fonts/NotoSansJP-Regular.ttf',
-            default_font_size=12
+        if settings['use_gpu']:
+            # CUDNNのカーネル選択を最初の画像の前に済ませる
+            self.text_extractor.warmup(batch_size=OCR_BATCH_SIZE)
+
+        self.translator = GeminiTranslator(cache_path=TRANSLATION_CACHE_FILE)
+
+        # テキスト除去・再描画はワーカープロセスで実行する（src/inpaint_worker.py参照）
+
+    def extract_texts_batched(self, image_paths, images=None):
+        """複数画像のテキストをまとめて抽出（画像パスをキーとした辞書を返す）"""
+        return self.text_extractor.extract_text_batched(image_paths, batch_size=OCR_BATCH_SIZE, images=images)
+
+    @staticmethod
+    def build_contexts(extracted_texts):
+        """翻訳のコンテキスト情報として各テキストの位置情報を作成"""
+        return [f"位置: ({item['bbox'][0]}, {item['bbox'][1]}) サイズ: {item['bbox'][2]}x{item['bbox'][3]}" for item in extracted_texts]
+
+    def translate_texts_grouped(self, extracted_groups, target_language, failed=None):
+        """複数画像の抽出結果をまとめて1回のリクエストで翻訳（failedには翻訳に失敗したテキストを追加）"""
+        return self.translator.translate_texts_grouped(
+            [[item['text'] for item in extracted] for extracted in extracted_groups],
+            target_language=target_language,
+            context_groups=[self.build_contexts(extracted) for extracted in extracted_groups],
+            failed=failed
         )
 
-    def process_single_image(self, image_path, output_path, session_id):
-        """単一の画像を処理"""
+    def process_single_image(self, image_path, output_path, session_id, target_language,
+                             extracted_texts=None, translated_texts=None):
+        """単一の画像を処理（extracted_texts/translated_textsが渡された場合はOCR/翻訳を省略）"""
         try:
             self.logger.info(f"処理開始: {os.path.basename(image_path)}")
 
             # 1. テキスト抽出
-            extracted_texts = self.text_extractor.extract_text(image_path)
+            if extracted_texts is None:
+                extracted_texts = self.text_extractor.extract_text(image_path)
             if not extracted_texts:
                 self.logger.warning(f"テキストが検出されませんでした: {image_path}")
                 return False
 
             # 進捗更新
-            socketio.emit('progress', {
+            progress_emitter.push(session_id, {
                 'session_id': session_id,
                 'message': f'テキスト検出完了: {len(extracted_texts)}個の領域',
                 'progress': 25
             })
 
             # 2. 翻訳（バルク処理）
-            original_texts = [item['text'] for item in extracted_texts]
-            # コンテキスト情報として各テキストの位置情報を渡す
-            contexts = [f"位置: ({item['bbox'][0]}, {item['bbox'][1]}) サイズ: {item['bbox'][2]}x{item['bbox'][3]}" for item in extracted_texts]
-
-            # バルク翻訳を実行
-            bulk_result = self.translator.bulk_translate_json(
-                original_texts,
-                target_language=self.settings['target_language'],
-                contexts=contexts
-            )
-
-            # 翻訳結果を抽出
-            sorted_translations = sorted(bulk_result['translations'], key=lambda x: x['id'])
-            translated_texts = [t['translated_text'] for t in sorted_translations]
-            self.logger.info(f"バルク翻訳成功: {len(translated_texts)}件のテキストを翻訳")
-
-            socketio.emit('progress', {
+            if translated_texts is None:
+                original_texts = [item['text'] for item in extracted_texts]
+                # コンテキスト情報として各テキストの位置情報を渡す
+                contexts = self.build_contexts(extracted_texts)
+
+                # バルク翻訳を実行
+                bulk_result = self.translator.bulk_translate_json(
+                    original_texts,
+                    target_language=target_language,
+                    contexts=contexts
+                )
+
+                # 翻訳結果を抽出
+                sorted_translations = sorted(bulk_result['translations'], key=lambda x: x['id'])
+                translated_texts = [t['translated_text'] for t in sorted_translations]
+                self.logger.info(f"バルク翻訳成功: {len(translated_texts)}件のテキストを翻訳")
+
+            progress_emitter.push(session_id, {
                 'session_id': session_id,
                 'message': '翻訳完了',
                 'progress': 50
             })
 
-            # 3. 元の画像を読み込み
-            import cv2
-            original_image = cv2.imread(image_path)
-            if original_image is None:
-                self.logger.error(f"画像の読み込みに失敗: {image_path}")
-                return False
-
-            # 4. テキスト除去
+            # 3-6. 画像の読み込み・テキスト除去・翻訳テキスト描画・保存をワーカープロセスで実行
             bboxes = [item['bbox'] for item in extracted_texts]
-            inpainted_image = self.inpainter.remove_text(original_image, bboxes)
-
-            socketio.emit('progress', {
-                'session_id': session_id,
-                'message': 'テキスト除去完了',
-                'progress': 75
-            })
-
-            # 5. 翻訳テキストを描画
             text_data = []
             for i, (extracted, translated) in enumerate(zip(extracted_texts, translated_texts)):
                 text_data.append({
@@ -168,13 +310,22 @@ class ImageTranslationPipeline:
                     'color': None
                 })
 
-            result_image = self.renderer.batch_render_text(inpainted_image, text_data)
+            future = get_inpaint_executor().submit(
+                inpaint_and_render, image_path, bboxes, text_data, output_path
+            )
+            # OSスレッドで結果を待ち、eventletのハブを止めない
+            if not eventlet.tpool.execute(future.result):
+                self.logger.error(f"テキスト除去・描画に失敗: {image_path}")
+                return False
 
-            # 6. 結果を保存
-            cv2.imwrite(output_path, result_image)
+            progress_emitter.push(session_id, {
+                'session_id': session_id,
+                'message': 'テキスト除去完了',
+                'progress': 75
+            })
             self.logger.info(f"保存完了: {output_path}")
 
-            socketio.emit('progress', {
+            progress_emitter.push(session_id, {
                 'session_id': session_id,
                 'message': '処理完了',
                 'progress': 100,
@@ -185,12 +336,58 @@ class ImageTranslationPipeline:
 
         except Exception as e:
             self.logger.error(f"画像処理エラー: {e}")
+            progress_emitter.flush(session_id)
             socketio.emit('error', {
                 'session_id': session_id,
                 'message': f'処理エラー: {str(e)}'
             })
             return False
 
+# (ocr_languages, use_gpu)ごとに共有するパイプライン
+_pipeline_cache = {}
+_pipeline_lock = eventlet.semaphore.Semaphore()
+
+def get_pipeline(settings):
+    """設定に対応する共有パイプラインを取得（未作成の場合は作成）"""
+    key = (tuple(settings['ocr_languages']), settings['use_gpu'])
+    with _pipeline_lock:
+        pipeline = _pipeline_cache.get(key)
+        if pipeline is None:
+            logger.info(f"パイプラインを作成します: {key}")
+            # モデルの読み込みとGPUのウォームアップはOSスレッドで実行し、eventletのハブを止めない
+            pipeline = eventlet.tpool.execute(ImageTranslationPipeline, {
+                'ocr_languages': list(key[0]),
+                'use_gpu': key[1]
+            })
+            _pipeline_cache[key] = pipeline
+        return pipeline
+
+def cleanup_periodically():
+    """CLEANUP_INTERVAL秒ごとに古いファイルをクリーンアップ（孤立ディレクトリの索引は呼び出し間で使い回される）"""
+    while True:
+        eventlet.sleep(CLEANUP_INTERVAL)
+        try:
+            cleanup_result = file_manager.cleanup_old_files()
+            logger.info(f"定期クリーンアップ完了: {len(cleanup_result['deleted_sessions'])} セッション削除, {cleanup_result['freed_space_mb']:.2f} MB 解放")
+        except Exception as e:
+            logger.error(f"定期クリーンアップエラー: {e}")
+
+def cuda_available():
+    """CUDAが利用可能かどうか（PyTorchがインストールされていない場合はFalse）"""
+    try:
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
+
+def warmup_pipelines(use_gpu=True):
+    """よく使われる言語設定のパイプラインを事前に作成"""
+    for ocr_languages in (['en'], ['ch_sim', 'en']):
+        try:
+            get_pipeline({'ocr_languages': ocr_languages, 'use_gpu': use_gpu})
+        except Exception as e:
+            logger.error(f"パイプラインのウォームアップに失敗 ({ocr_languages}): {e}")
+
 @app.route('/')
 def index():
     """メインページ"""
@@ -217,30 +414,26 @@ def upload_files():
         output_folder = os.path.join(app.config['OUTPUT_FOLDER'], session_id)
         os.makedirs(output_folder, exist_ok=True)
 
-        # ファイルの保存
+        # ファイルの保存（書き込みをOSスレッドで並行して実行）
         uploaded_files = []
+        save_pile = eventlet.GreenPile()
         for file in files:
             if file and allowed_file(file.filename):
                 filename = secure_filename(file.filename)
                 file_path = os.path.join(upload_folder, filename)
-                file.save(file_path)
+                save_pile.spawn(eventlet.tpool.execute, save_upload, file, file_path)
                 uploaded_files.append({
                     'original_name': filename,
                     'path': file_path
                 })
+        # 全ての書き込み完了を待つ（失敗時は例外が送出される）
+        list(save_pile)
 
         # 設定の取得（中国語または英語単体のみ）
         raw_language = settings.get('ocr_languages', 'en').split(',')[0].strip()
 
         # 言語コードをEasyOCR対応に変換
-        language_mapping = {
-            'chinese': 'ch_sim',
-            'zh': 'ch_sim',
-            'english': 'en',
-            'en': 'en'
-        }
-
-        ocr_language = language_mapping.get(raw_language.lower(), raw_language)
+        ocr_language = _LANGUAGE_MAPPING.get(raw_language.lower(), raw_language)
 
         # EasyOCRの制限に合わせて言語組み合わせを調整
         ocr_languages = adjust_ocr_languages([ocr_language])
@@ -258,7 +451,8 @@ def upload_files():
             'settings': pipeline_settings,
             'output_folder': output_folder,
             'completed': 0,
-            'total': len(uploaded_files)
+            'total': len(uploaded_files),
+            'cancel_event': eventlet.event.Event()
         }
         file_manager.register_session(session_id, uploaded_files, pipeline_settings)
 
@@ -266,12 +460,8 @@ def upload_files():
         processing_sessions[session_id] = session_data
 
         # バックグラウンドで処理を開始
-        thread = threading.Thread(
-            target=process_files_background,
-            args=(session_id,)
-        )
-        thread.daemon = True
-        thread.start()
+        # プールが埋まっている場合spawn_nは空きを待つため、レスポンスを止めないよう別のグリーンスレッドから投入する
+        eventlet.spawn_n(worker_pool.spawn_n, process_files_background, session_id)
 
         return jsonify({
             'session_id': session_id,
@@ -289,14 +479,75 @@ def process_files_background(session_id):
         if not session:
             return
 
-        pipeline = ImageTranslationPipeline(session['settings'])
+        pipeline = get_pipeline(session['settings'])
+
+        # 全ファイルのOCRを先にバッチで実行
+        progress_emitter.push(session_id, {
+            'session_id': session_id,
+            'message': f'テキスト検出中: {session["total"]}ファイル',
+            'progress': 0,
+            'total_files': session["total"]
+        })
+        image_paths = [f['path'] for f in session['files']]
+        ocr_languages = session['settings']['ocr_languages']
+        target_language = session['settings']['target_language']
+
+        # 同じ内容のファイルはキャッシュ済みのOCR・翻訳結果を使用
+        ocr_results = {}
+        translation_results = {}
+        file_hashes = {}
+        pending_paths = []
+        # ハッシュ計算で読み込んだバイト列をデコードしてOCRに渡す（再読み込みを避ける）
+        decoded_images = {}
+        for path in image_paths:
+            file_hash, data = eventlet.tpool.execute(read_upload, path)
+            file_hashes[path] = file_hash
+            cached = file_manager.get_cached_ocr(file_hash, ocr_languages, target_language)
+            if cached:
+                ocr_results[path] = cached['extracted_texts']
+                translation_results[path] = cached['translated_texts']
+            else:
+                pending_paths.append(path)
+                image = eventlet.tpool.execute(decode_image, data)
+                if image is not None:
+                    decoded_images[path] = image
+
+        if pending_paths:
+            # OCRと翻訳はOSスレッドで実行し、eventletのハブを止めない
+            ocr_results.update(eventlet.tpool.execute(
+                pipeline.extract_texts_batched, pending_paths, images=decoded_images
+            ))
+            decoded_images.clear()
+
+            # 全ファイルのテキストを1回のリクエストで翻訳
+            progress_emitter.push(session_id, {
+                'session_id': session_id,
+                'message': '翻訳中...',
+                'progress': 0,
+                'total_files': session["total"]
+            })
+            extracted_groups = [ocr_results[path] for path in pending_paths]
+            failed_texts = set()
+            translated_groups = eventlet.tpool.execute(
+                pipeline.translate_texts_grouped, extracted_groups, target_language, failed_texts
+            )
+
+            for path, extracted, translated in zip(pending_paths, extracted_groups, translated_groups):
+                translation_results[path] = translated
+                # 検出なし・翻訳に失敗したテキストを含む結果はキャッシュしない
+                # （翻訳不要で原文のまま返されたテキストのみの結果はキャッシュする）
+                if extracted and not any(item['text'] in failed_texts for item in extracted):
+                    file_manager.put_cached_ocr(file_hashes[path], ocr_languages, target_language, {
+                        'extracted_texts': extracted,
+                        'translated_texts': translated
+                    })
 
         for i, file_info in enumerate(session['files']):
-            if session_id not in processing_sessions:
-                break  # セッションが削除された場合
+            if session['cancel_event'].ready():
+                break  # セッションがキャンセルされた場合
 
             # 進捗更新
-            socketio.emit('progress', {
+            progress_emitter.push(session_id, {
                 'session_id': session_id,
                 'message': f'処理中 ({i+1}/{session["total"]}): {file_info["original_name"]}',
                 'progress': int((i / session["total"]) * 100),
@@ -315,22 +566,22 @@ def process_files_background(session_id):
             success = pipeline.process_single_image(
                 file_info['path'],
                 output_path,
-                session_id
+                session_id,
+                target_language,
+                extracted_texts=ocr_results.get(file_info['path']),
+                translated_texts=translation_results.get(file_info['path'])
             )
 
             if success:
                 session['completed'] += 1
                 # ファイルマネージャーに完了ファイルを登録
-                original_name = file_info["original_name"]
-                name, ext = os.path.splitext(original_name)
-                output_filename = f"{name}_translated{ext}"
-                output_path = os.path.join(session['output_folder'], output_filename)
-
-                if os.path.exists(output_path):
-                    file_manager.add_completed_file(session_id, original_name, output_path)
+                # （成功時は書き込み済みのため、パスを再生成してstatで確認し直さない）
+                file_manager.add_completed_file(session_id, file_info["original_name"], output_path)
 
         # セッション情報を更新
-        file_manager.update_session_status(session_id, 'completed')
+        file_manager.update_session_status(
+            session_id, 'cancelled' if session['cancel_event'].ready() else 'completed'
+        )
 
         # セッション情報を取得してダウンロードリンクを作成
         session_info = file_manager.get_session_info(session_id)
@@ -341,6 +592,7 @@ def process_files_background(session_id):
         # 処理完了（ダウンロードリンク付き）
         logger.info(f"処理完了イベントを送信: session_id={session_id}, download_links={len(download_links)}件")
         logger.info(f"ダウンロードリンク: {download_links}")
+        progress_emitter.close(session_id)
         socketio.emit('processing_complete', {
             'session_id': session_id,
             'message': f'処理完了: {session["completed"]}/{session["total"]}ファイル',
@@ -350,6 +602,7 @@ def process_files_background(session_id):
 
     except Exception as e:
         logger.error(f"バックグラウンド処理エラー: {e}")
+        progress_emitter.close(session_id)
         socketio.emit('error', {
             'session_id': session_id,
             'message': f'処理エラー: {str(e)}'
@@ -389,7 +642,17 @@ def list_output_files(session_id):
                 'settings': session_info.get('settings', {})
             })
         else:
-            return jsonify({'files': []})
+            # メタデータに無い場合は出力ディレクトリを直接走査
+            output_folder = os.path.join(app.config['OUTPUT_FOLDER'], secure_filename(session_id))
+            if not os.path.isdir(output_folder):
+                return jsonify({'files': []})
+            with os.scandir(output_folder) as it:
+                files = [
+                    {'name': entry.name, 'url': f'/output/{session_id}/{entry.name}'}
+                    for entry in it
+                    if entry.is_file() and entry.name.lower().endswith(TRANSLATED_SUFFIXES)
+                ]
+            return jsonify({'session_id': session_id, 'files': files})
     except Exception as e:
         logger.error(f"ファイル一覧エラー: {e}")
         return jsonify({'error': str(e)}), 500
@@ -407,6 +670,18 @@ def get_session_info(session_id):
         logger.error(f"セッション情報取得エラー: {e}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/session/<session_id>/cancel', methods=['POST'])
+def cancel_session(session_id):
+    """処理中のセッションをキャンセル（現在のファイルの処理後に停止）"""
+    session = processing_sessions.get(session_id)
+    if not session:
+        return jsonify({'error': 'Session not found'}), 404
+
+    if not session['cancel_event'].ready():
+        session['cancel_event'].send()
+        logger.info(f"セッションのキャンセルを受け付けました: {session_id}")
+    return jsonify({'session_id': session_id, 'cancelled': True})
+
 @app.route('/api/sessions')
 def get_all_sessions():
     """全てのセッション情報を取得"""
@@ -437,5 +712,15 @@ if __name__ == '__main__':
     cleanup_result = file_manager.cleanup_old_files()
     logger.info(f"クリーンアップ完了: {cleanup_result['deleted_sessions']} セッション削除, {cleanup_result['freed_space_mb']:.2f} MB 解放")
 
+    # 長時間稼働時も保持期限を過ぎたファイルを削除する
+    eventlet.spawn_n(cleanup_periodically)
+
+    # 初回リクエストの遅延を減らすためパイプラインを事前に作成（未指定の場合はCUDAの有無で判定）
+    warmup_use_gpu = os.getenv('WARMUP_USE_GPU')
+    eventlet.spawn_n(
+        warmup_pipelines,
+        cuda_available() if warmup_use_gpu is None else warmup_use_gpu.lower() == 'true'
+    )
+
     # サーバーの起動
     socketio.run(app, debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
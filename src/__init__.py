@@ -1,14 +1,27 @@
 """
 画像翻訳Webアプリケーション
 """
-from .ocr import TextExtractor
-from .translation import GeminiTranslator
-from .image_processing import TextInpainter
-from .text_rendering import TextRenderer
+import importlib
+
+# 公開クラスと定義元のサブモジュール
+# spawnされたワーカー（inpaint_worker）がOCRや翻訳の依存を読み込まないよう、初回参照時にimportする
+_EXPORTS = {
+    'TextExtractor': '.ocr',
+    'GeminiTranslator': '.translation',
+    'TextInpainter': '.image_processing',
+    'TextRenderer': '.text_rendering'
+}
 
 __all__ = [
     'TextExtractor',
     'GeminiTranslator',
     'TextInpainter',
     'TextRenderer'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name, __name__), name)
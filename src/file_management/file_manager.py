@@ -2,58 +2,183 @@
 ファイル管理・クリーンアップモジュール
 """
 import os
-import json
+import time
+import atexit
+import sqlite3
+import heapq
 import shutil
+import subprocess
+import threading
+from contextlib import closing, contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 import logging
 
+import orjson
+
+try:
+    import fcntl
+except ImportError:  # Windowsではプロセス間ロックを行わない（単一プロセスでの使用を前提とする）
+    fcntl = None
+
+# スナップショットが小さい場合でもこのサイズまではコンパクションしない
+METADATA_COMPACT_MIN_BYTES = 64 * 1024
+
+# ディレクトリの削除をバックグラウンドで行うrmコマンド（無い環境ではプロセス内で削除する）
+RM_COMMAND = shutil.which('rm')
+
+
 class FileManager:
     """ファイル管理・クリーンアップクラス"""
 
-    def __init__(self, base_dir: str = ".", max_age_hours: int = 24):
+    def __init__(self, base_dir: str = ".", max_age_hours: int = 24, flush_interval: float = 0.1):
         """
         初期化
 
         Args:
             base_dir: ベースディレクトリ
             max_age_hours: ファイルの最大保持時間（時間）
+            flush_interval: メタデータ変更をまとめて書き込むまでの待ち時間（秒）
         """
         self.base_dir = base_dir
         self.max_age_hours = max_age_hours
+        self.flush_interval = flush_interval
         self.uploads_dir = os.path.join(base_dir, 'uploads')
         self.output_dir = os.path.join(base_dir, 'output')
         # メタデータファイルはベースディレクトリのdbディレクトリに保存
+        # file_metadata.jsonがスナップショット、file_metadata.logがそれ以降の変更の追記ログ
         self.metadata_file = os.path.join(base_dir, 'db', 'file_metadata.json')
+        self.metadata_log_file = os.path.join(base_dir, 'db', 'file_metadata.log')
+        # OCR・翻訳結果のキャッシュ（ファイル内容のSHA-256をキーとする）
+        self.ocr_cache_file = os.path.join(base_dir, 'db', 'ocr_cache.sqlite3')
         self.logger = logging.getLogger(__name__)
 
-        # メタデータファイルの読み込み
+        # メタデータの書き込みはバックグラウンドでまとめて行う（_mark_dirty参照）
+        # self.metadataは読み取り専用のスナップショットとして扱い、変更時は_lockを取得して
+        # 新しい辞書に差し替える（読み取り側はロック不要）
+        self._lock = threading.RLock()
+        self._dirty_event = threading.Event()
+        self._log_fp = None
+        # 追記ログへ未書き込みのレコード（flush時にプロセス間ロックを取得して1回で書き込む）
+        self._pending_records: List[bytes] = []
+        # 書き込みスレッドは最初の変更時に起動する（_start_flusher参照）
+        self._flush_thread = None
+
+        # 孤立ディレクトリ候補（(作成時刻, 種類, ディレクトリ名)の最小ヒープ）
+        self._orphan_candidates: List[Tuple[float, str, str]] = []
+        self._orphan_seen = set()
+
+        # バックグラウンドで実行中のrmプロセス（_remove_dir参照）
+        self._rm_processes: List[subprocess.Popen] = []
+
+        # メタデータファイルの読み込み（スナップショット + 追記ログの再生）
         self.metadata = self._load_metadata()
 
+        # OCRキャッシュの初期化
+        self._initialize_ocr_cache()
+
     def _load_metadata(self) -> Dict:
-        """メタデータファイルを読み込む"""
+        """メタデータを読み込み、古いセッションを削除する"""
+        try:
+            os.makedirs(os.path.dirname(self.metadata_log_file), exist_ok=True)
+            self._log_fp = open(self.metadata_log_file, 'ab', buffering=0)
+        except Exception as e:
+            self.logger.error(f"メタデータログを開けません: {e}")
+
+        # 他のプロセスがコンパクション中のスナップショット・ログを読まないようにする
+        with self._log_file_lock(exclusive=False):
+            metadata = self._read_metadata_files()
+
+        # 古いセッションをクリーンアップ
+        self._cleanup_old_sessions(metadata)
+
+        # created_at_tsを持たない古いメタデータは読み込み時に一度だけ補完する
+        for session_data in metadata.values():
+            if 'created_at_ts' not in session_data and 'created_at' in session_data:
+                session_data['created_at_ts'] = self._created_at_ts(session_data)
+        return metadata
+
+    def _read_metadata_files(self) -> Dict:
+        """スナップショットを読み込んだ後、追記ログを再生したメタデータを返す"""
+        metadata = {}
         if os.path.exists(self.metadata_file):
             try:
-                with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                # 古いセッションをクリーンアップ
-                self._cleanup_old_sessions(metadata)
-                return metadata
+                with open(self.metadata_file, 'rb') as f:
+                    metadata = orjson.loads(f.read())
             except Exception as e:
                 self.logger.error(f"メタデータ読み込みエラー: {e}")
-                return {}
-        return {}
+                metadata = {}
+
+        if os.path.exists(self.metadata_log_file):
+            try:
+                with open(self.metadata_log_file, 'rb') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        try:
+                            self._apply_record(metadata, orjson.loads(line))
+                        except ValueError:
+                            # 書き込み途中で終了した最終行などは無視
+                            self.logger.warning("メタデータログの不正な行をスキップしました")
+            except Exception as e:
+                self.logger.error(f"メタデータログ読み込みエラー: {e}")
+        return metadata
+
+    @contextmanager
+    def _log_file_lock(self, exclusive: bool = True):
+        """
+        追記ログのファイルロックを取得する（同じdbディレクトリを使う他のプロセスとの排他）
+
+        Args:
+            exclusive: 排他ロックを取得するかどうか（Falseの場合は共有ロック）
+        """
+        if fcntl is None or self._log_fp is None:
+            yield
+            return
+
+        fd = self._log_fp.fileno()
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _apply_record(metadata: Dict, record: Dict):
+        """追記ログの1レコードをメタデータに適用する"""
+        op = record['op']
+        session_id = record['sid']
+        if op == 'register':
+            metadata[session_id] = record['data']
+        elif op == 'delete':
+            metadata.pop(session_id, None)
+        elif session_id in metadata:
+            session_data = metadata[session_id]
+            if op == 'status':
+                session_data['status'] = record['status']
+                session_data['updated_at'] = record['updated_at']
+            elif op == 'add_completed':
+                # スナップショット作成直後に終了した場合の再適用で重複しないようにする
+                if record['file'] not in session_data['completed_files']:
+                    session_data['completed_files'].append(record['file'])
+                session_data['updated_at'] = record['updated_at']
+
+    def _append_record(self, record: Dict):
+        """変更レコードを追記ログ用に保持する（ディスクへの書き込みはバックグラウンドで行う）"""
+        with self._lock:
+            if self._log_fp is not None:
+                self._pending_records.append(orjson.dumps(record) + b"\n")
+        self._mark_dirty()
 
     def _cleanup_old_sessions(self, metadata: Dict):
         """メタデータから古いセッションを削除"""
-        cutoff_time = datetime.now() - timedelta(hours=self.max_age_hours)
+        cutoff_ts = self._cutoff_ts()
         sessions_to_remove = []
 
         for session_id, session_data in metadata.items():
             if 'created_at' in session_data:
                 try:
-                    created_at = datetime.fromisoformat(session_data['created_at'])
-                    if created_at < cutoff_time:
+                    if self._created_at_ts(session_data) < cutoff_ts:
                         sessions_to_remove.append(session_id)
                 except Exception as e:
                     self.logger.warning(f"セッション {session_id} の日付解析エラー: {e}")
@@ -62,19 +187,107 @@ class FileManager:
         # 古いセッションを削除
         for session_id in sessions_to_remove:
             del metadata[session_id]
+            self._append_record({'op': 'delete', 'sid': session_id})
             self.logger.info(f"メタデータから古いセッションを削除: {session_id}")
 
-        if sessions_to_remove:
-            self._save_metadata()
+    def _cutoff_ts(self) -> float:
+        """保持期限のUnix時刻（これより前に作成されたセッションは古い）"""
+        return time.time() - self.max_age_hours * 3600
 
-    def _save_metadata(self):
-        """メタデータを保存する"""
+    @staticmethod
+    def _created_at_ts(session_data: Dict) -> int:
+        """
+        セッションの作成時刻をUnix時刻で取得
+
+        created_at_tsを持たない場合はcreated_atを解析する
+        （スナップショットを書き換えないよう、結果は保持しない）
+        """
+        created_at_ts = session_data.get('created_at_ts')
+        if created_at_ts is None:
+            created_at_ts = int(datetime.fromisoformat(session_data['created_at']).timestamp())
+        return created_at_ts
+
+    def _mark_dirty(self):
+        """メタデータの変更を記録（実際の書き込みはバックグラウンドスレッドで行う）"""
+        self._start_flusher()
+        self._dirty_event.set()
+
+    def _start_flusher(self):
+        """書き込みスレッドを起動し、終了時の書き込みを登録する（初回のみ）"""
+        with self._lock:
+            if self._flush_thread is None:
+                self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+                self._flush_thread.start()
+                atexit.register(self.flush)
+
+    def _flush_loop(self):
+        """変更をflush_interval分まとめてからメタデータを書き込むバックグラウンドループ"""
+        while True:
+            self._dirty_event.wait()
+            time.sleep(self.flush_interval)
+            with self._lock:
+                self._dirty_event.clear()
+                self._flush_locked()
+
+    def flush(self):
+        """未書き込みのメタデータを即座に保存する"""
+        with self._lock:
+            if self._dirty_event.is_set():
+                self._dirty_event.clear()
+                self._flush_locked()
+
+    def _flush_locked(self):
+        """保持中のレコードを追記ログに書き込み、必要に応じてコンパクションする（_lock取得済みで呼び出す）"""
+        if self._log_fp is None:
+            return
         try:
-            with open(self.metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(self.metadata, f, ensure_ascii=False, indent=2)
+            with self._log_file_lock():
+                if self._pending_records:
+                    records = b"".join(self._pending_records)
+                    self._pending_records.clear()
+                    self._log_fp.write(records)
+                self._maybe_compact_locked()
         except Exception as e:
             self.logger.error(f"メタデータ保存エラー: {e}")
 
+    def _maybe_compact_locked(self):
+        """
+        追記ログがスナップショットの4倍を超えたらスナップショットを作り直してログを空にする
+        （ファイルロック取得済みで呼び出す）
+
+        他のプロセスが追記したレコードを失わないよう、スナップショットはメモリ上の状態ではなく
+        ディスク上のスナップショットとログから作り直す
+        """
+        log_size = os.path.getsize(self.metadata_log_file) if os.path.exists(self.metadata_log_file) else 0
+        snapshot_size = os.path.getsize(self.metadata_file) if os.path.exists(self.metadata_file) else 0
+        if log_size <= 4 * max(snapshot_size, METADATA_COMPACT_MIN_BYTES):
+            return
+
+        metadata = self._read_metadata_files()
+        tmp_file = f"{self.metadata_file}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        os.replace(tmp_file, self.metadata_file)
+
+        # スナップショットに反映済みのログを空にする（追記モードのため他のプロセスも先頭から書き込む）
+        self._log_fp.truncate(0)
+        self.logger.info(f"メタデータをコンパクションしました: ログ {log_size} bytes")
+
+    def _replace_sessions_locked(self, updates: Dict[str, Optional[Dict]]):
+        """
+        セッションを差し替えた新しいメタデータ辞書を作成して公開する（ロック取得済みで呼び出す）
+
+        Args:
+            updates: セッションIDをキーとした新しいセッション情報（Noneの場合は削除）
+        """
+        metadata = dict(self.metadata)
+        for session_id, session_data in updates.items():
+            if session_data is None:
+                metadata.pop(session_id, None)
+            else:
+                metadata[session_id] = session_data
+        self.metadata = metadata
+
     def register_session(self, session_id: str, files: List[Dict], settings: Dict) -> Dict:
         """
         セッションを登録する
@@ -87,9 +300,11 @@ class FileManager:
         Returns:
             登録されたセッション情報
         """
+        now = datetime.now()
         session_data = {
             'session_id': session_id,
-            'created_at': datetime.now().isoformat(),
+            'created_at': now.isoformat(),
+            'created_at_ts': int(now.timestamp()),
             'files': files,
             'settings': settings,
             'status': 'processing',
@@ -97,8 +312,9 @@ class FileManager:
             'output_files': []
         }
 
-        self.metadata[session_id] = session_data
-        self._save_metadata()
+        with self._lock:
+            self._replace_sessions_locked({session_id: session_data})
+            self._append_record({'op': 'register', 'sid': session_id, 'data': session_data})
         self.logger.info(f"セッション登録: {session_id}")
 
         return session_data
@@ -111,10 +327,15 @@ class FileManager:
             session_id: セッションID
             status: 新しいステータス
         """
-        if session_id in self.metadata:
-            self.metadata[session_id]['status'] = status
-            self.metadata[session_id]['updated_at'] = datetime.now().isoformat()
-            self._save_metadata()
+        with self._lock:
+            session_data = self.metadata.get(session_id)
+            if session_data is not None:
+                updated_at = datetime.now().isoformat()
+                self._replace_sessions_locked({
+                    session_id: {**session_data, 'status': status, 'updated_at': updated_at}
+                })
+                self._append_record({'op': 'status', 'sid': session_id,
+                                     'status': status, 'updated_at': updated_at})
 
     def add_completed_file(self, session_id: str, original_name: str, output_path: str):
         """
@@ -125,19 +346,93 @@ class FileManager:
             original_name: オリジナルファイル名
             output_path: 出力ファイルパス
         """
-        if session_id in self.metadata:
-            completed_file = {
-                'original_name': original_name,
-                'output_path': output_path,
-                'completed_at': datetime.now().isoformat(),
-                'download_url': f"/output/{session_id}/{os.path.basename(output_path)}"
-            }
+        completed_file = {
+            'original_name': original_name,
+            'output_path': output_path,
+            'completed_at': datetime.now().isoformat(),
+            'download_url': f"/output/{session_id}/{os.path.basename(output_path)}"
+        }
 
-            self.metadata[session_id]['completed_files'].append(completed_file)
-            self.metadata[session_id]['updated_at'] = datetime.now().isoformat()
-            self._save_metadata()
+        with self._lock:
+            session_data = self.metadata.get(session_id)
+            if session_data is None:
+                return
+            self._replace_sessions_locked({session_id: {
+                **session_data,
+                'completed_files': session_data['completed_files'] + [completed_file],
+                'updated_at': completed_file['completed_at']
+            }})
+            self._append_record({'op': 'add_completed', 'sid': session_id, 'file': completed_file,
+                                 'updated_at': completed_file['completed_at']})
+
+        self.logger.info(f"完了ファイル追加: {session_id} - {original_name}")
+
+    def _connect_ocr_cache(self) -> sqlite3.Connection:
+        """OCRキャッシュDBへの接続を作成"""
+        return sqlite3.connect(self.ocr_cache_file, timeout=10)
+
+    def _initialize_ocr_cache(self):
+        """OCRキャッシュDBの初期化"""
+        try:
+            os.makedirs(os.path.dirname(self.ocr_cache_file), exist_ok=True)
+            with closing(self._connect_ocr_cache()) as conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS ocr_cache ('
+                    ' sha256 TEXT NOT NULL,'
+                    ' ocr_languages TEXT NOT NULL,'
+                    ' target_language TEXT NOT NULL,'
+                    ' data TEXT NOT NULL,'
+                    ' created_at TEXT NOT NULL,'
+                    ' PRIMARY KEY (sha256, ocr_languages, target_language))'
+                )
+                conn.commit()
+        except Exception as e:
+            self.logger.error(f"OCRキャッシュ初期化エラー: {e}")
 
-            self.logger.info(f"完了ファイル追加: {session_id} - {original_name}")
+    def get_cached_ocr(self, sha256: str, ocr_languages: List[str], target_language: str) -> Optional[Dict]:
+        """
+        キャッシュされたOCR・翻訳結果を取得
+
+        Args:
+            sha256: ファイル内容のハッシュ
+            ocr_languages: OCR言語のリスト
+            target_language: 翻訳先言語
+
+        Returns:
+            'extracted_texts'と'translated_texts'を含む辞書、存在しない場合はNone
+        """
+        try:
+            with closing(self._connect_ocr_cache()) as conn:
+                row = conn.execute(
+                    'SELECT data FROM ocr_cache WHERE sha256 = ? AND ocr_languages = ? AND target_language = ?',
+                    (sha256, ','.join(ocr_languages), target_language)
+                ).fetchone()
+            return orjson.loads(row[0]) if row else None
+        except Exception as e:
+            self.logger.error(f"OCRキャッシュ読み込みエラー: {e}")
+            return None
+
+    def put_cached_ocr(self, sha256: str, ocr_languages: List[str], target_language: str, data: Dict):
+        """
+        OCR・翻訳結果をキャッシュに保存
+
+        Args:
+            sha256: ファイル内容のハッシュ
+            ocr_languages: OCR言語のリスト
+            target_language: 翻訳先言語
+            data: 'extracted_texts'と'translated_texts'を含む辞書
+        """
+        try:
+            with closing(self._connect_ocr_cache()) as conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO ocr_cache VALUES (?, ?, ?, ?, ?)',
+                    (sha256, ','.join(ocr_languages), target_language,
+                     orjson.dumps(data).decode('utf-8'), datetime.now().isoformat())
+                )
+                conn.commit()
+        except Exception as e:
+            self.logger.error(f"OCRキャッシュ保存エラー: {e}")
 
     def get_session_info(self, session_id: str) -> Optional[Dict]:
         """
@@ -151,18 +446,33 @@ class FileManager:
         """
         return self.metadata.get(session_id)
 
+    def iter_sessions(self) -> Iterator[Tuple[str, Dict]]:
+        """
+        全てのセッションを (セッションID, セッション情報) として順に返す
+
+        呼び出し時点のスナップショットを走査するため、途中で変更があっても影響を受けない。
+        セッション情報はコピーしないため、変更する場合は呼び出し側でコピーすること
+
+        Returns:
+            (セッションID, セッション情報) のイテレータ
+        """
+        return iter(self.metadata.items())
+
     def get_all_sessions(self) -> List[Dict]:
         """
         全てのセッション情報を取得
 
+        セッション情報はスナップショットをそのまま返す（変更しないこと）
+
         Returns:
             セッション情報のリスト
         """
         sessions = []
-        for session_id, session_data in self.metadata.items():
-            session_info = session_data.copy()
-            session_info['session_id'] = session_id
-            sessions.append(session_info)
+        for session_id, session_data in self.iter_sessions():
+            # register_sessionで登録したセッションは既にsession_idを持つためコピー不要
+            if session_data.get('session_id') != session_id:
+                session_data = {**session_data, 'session_id': session_id}
+            sessions.append(session_data)
         return sessions
 
     def cleanup_old_files(self, dry_run: bool = False) -> Dict:
@@ -186,51 +496,45 @@ class FileManager:
         self.logger.info(f"クリーンアップ開始: {cutoff_time.isoformat()} より古いファイル")
 
         # 古いセッションを特定
+        cutoff_ts = self._cutoff_ts()
         sessions_to_delete = []
         for session_id, session_data in self.metadata.items():
-            created_at = datetime.fromisoformat(session_data['created_at'])
-            if created_at < cutoff_time:
+            if self._created_at_ts(session_data) < cutoff_ts:
                 sessions_to_delete.append(session_id)
 
-        # セッションと関連ファイルを削除
+        # 削除対象のディレクトリを列挙
+        dirs_to_delete = []
         for session_id in sessions_to_delete:
-            try:
-                session_data = self.metadata[session_id]
-
-                # アップロードディレクトリを削除
-                upload_session_dir = os.path.join(self.uploads_dir, session_id)
-                if os.path.exists(upload_session_dir):
+            for label, base_dir in (('アップロード', self.uploads_dir), ('出力', self.output_dir)):
+                session_dir = os.path.join(base_dir, session_id)
+                if os.path.exists(session_dir):
                     if not dry_run:
-                        shutil.rmtree(upload_session_dir)
-                        size = self._get_dir_size(upload_session_dir)
-                        result['freed_space'] += size
-                        self.logger.info(f"アップロードディレクトリ削除: {upload_session_dir} ({size} bytes)")
+                        dirs_to_delete.append((session_id, label, session_dir))
                     else:
-                        self.logger.info(f"[ドライラン] アップロードディレクトリ削除予定: {upload_session_dir}")
-
-                # 出力ディレクトリを削除
-                output_session_dir = os.path.join(self.output_dir, session_id)
-                if os.path.exists(output_session_dir):
-                    if not dry_run:
-                        shutil.rmtree(output_session_dir)
-                        size = self._get_dir_size(output_session_dir)
-                        result['freed_space'] += size
-                        self.logger.info(f"出力ディレクトリ削除: {output_session_dir} ({size} bytes)")
-                    else:
-                        self.logger.info(f"[ドライラン] 出力ディレクトリ削除予定: {output_session_dir}")
-
-                result['deleted_sessions'].append(session_id)
-                if not dry_run:
-                    del self.metadata[session_id]
+                        self.logger.info(f"[ドライラン] {label}ディレクトリ削除予定: {session_dir}")
 
+        # ディレクトリを削除
+        failed_sessions = set()
+        for session_id, label, session_dir in dirs_to_delete:
+            try:
+                size = self._remove_dir(session_dir)
+                result['freed_space'] += size
+                self.logger.info(f"{label}ディレクトリ削除: {session_dir} ({size} bytes)")
             except Exception as e:
+                failed_sessions.add(session_id)
                 error_msg = f"セッション {session_id} のクリーンアップ中にエラー: {e}"
                 result['errors'].append(error_msg)
                 self.logger.error(error_msg)
 
-        # メタデータを保存
+        # 削除に成功したセッションをメタデータから削除
+        for session_id in sessions_to_delete:
+            if session_id not in failed_sessions:
+                result['deleted_sessions'].append(session_id)
         if not dry_run and result['deleted_sessions']:
-            self._save_metadata()
+            with self._lock:
+                self._replace_sessions_locked(dict.fromkeys(result['deleted_sessions']))
+                for session_id in result['deleted_sessions']:
+                    self._append_record({'op': 'delete', 'sid': session_id})
 
         # 孤立したディレクトリをクリーンアップ
         self._cleanup_orphaned_directories(result, dry_run)
@@ -240,49 +544,136 @@ class FileManager:
 
         return result
 
+    def _index_orphan_candidates(self):
+        """
+        メタデータに無いディレクトリを孤立候補として登録する
+
+        作成時刻の取得（stat）は初めて見つけたディレクトリに対してのみ行い、
+        候補は作成時刻順のヒープで管理する
+        """
+        for kind, base_dir in (('uploads', self.uploads_dir), ('output', self.output_dir)):
+            if not os.path.exists(base_dir):
+                continue
+            with os.scandir(base_dir) as it:
+                for entry in it:
+                    key = (kind, entry.name)
+                    if key in self._orphan_seen or entry.name in self.metadata:
+                        continue
+                    if not entry.is_dir():
+                        continue
+                    try:
+                        ctime = entry.stat().st_ctime
+                    except OSError as e:
+                        self.logger.error(f"孤立ディレクトリ処理エラー {entry.path}: {e}")
+                        continue
+                    heapq.heappush(self._orphan_candidates, (ctime, kind, entry.name))
+                    self._orphan_seen.add(key)
+
     def _cleanup_orphaned_directories(self, result: Dict, dry_run: bool):
         """孤立したディレクトリをクリーンアップ"""
-        cutoff_time = datetime.now() - timedelta(hours=self.max_age_hours)
+        cutoff_ts = self._cutoff_ts()
+        self._index_orphan_candidates()
+
+        labels = {'uploads': 'アップロード', 'output': '出力'}
+        base_dirs = {'uploads': self.uploads_dir, 'output': self.output_dir}
+
+        if dry_run:
+            for ctime, kind, dirname in sorted(self._orphan_candidates):
+                if ctime >= cutoff_ts:
+                    break
+                if dirname not in self.metadata:
+                    dirpath = os.path.join(base_dirs[kind], dirname)
+                    self.logger.info(f"[ドライラン] 孤立{labels[kind]}ディレクトリ削除予定: {dirpath}")
+            return
+
+        # 作成時刻が古い順に取り出して削除
+        while self._orphan_candidates and self._orphan_candidates[0][0] < cutoff_ts:
+            _, kind, dirname = heapq.heappop(self._orphan_candidates)
+            self._orphan_seen.discard((kind, dirname))
+            if dirname in self.metadata:
+                continue
+
+            dirpath = os.path.join(base_dirs[kind], dirname)
+            try:
+                size = self._remove_dir(dirpath)
+                result['freed_space'] += size
+                result['deleted_files'].append(f"{kind}/{dirname}")
+                self.logger.info(f"孤立{labels[kind]}ディレクトリ削除: {dirpath}")
+            except FileNotFoundError:
+                # 既に削除されている
+                continue
+            except Exception as e:
+                self.logger.error(f"孤立ディレクトリ処理エラー {dirpath}: {e}")
 
-        # uploadsディレクトリのクリーンアップ
-        if os.path.exists(self.uploads_dir):
-            for dirname in os.listdir(self.uploads_dir):
-                dirpath = os.path.join(self.uploads_dir, dirname)
-                if os.path.isdir(dirpath):
-                    if dirname not in self.metadata:
-                        try:
-                            dir_time = datetime.fromtimestamp(os.path.getctime(dirpath))
-                            if dir_time < cutoff_time:
-                                if not dry_run:
-                                    shutil.rmtree(dirpath)
-                                    size = self._get_dir_size(dirpath)
-                                    result['freed_space'] += size
-                                    result['deleted_files'].append(f"uploads/{dirname}")
-                                    self.logger.info(f"孤立アップロードディレクトリ削除: {dirpath}")
-                                else:
-                                    self.logger.info(f"[ドライラン] 孤立アップロードディレクトリ削除予定: {dirpath}")
-                        except Exception as e:
-                            self.logger.error(f"孤立ディレクトリ処理エラー {dirpath}: {e}")
-
-        # outputディレクトリのクリーンアップ
-        if os.path.exists(self.output_dir):
-            for dirname in os.listdir(self.output_dir):
-                dirpath = os.path.join(self.output_dir, dirname)
-                if os.path.isdir(dirpath):
-                    if dirname not in self.metadata:
-                        try:
-                            dir_time = datetime.fromtimestamp(os.path.getctime(dirpath))
-                            if dir_time < cutoff_time:
-                                if not dry_run:
-                                    shutil.rmtree(dirpath)
-                                    size = self._get_dir_size(dirpath)
-                                    result['freed_space'] += size
-                                    result['deleted_files'].append(f"output/{dirname}")
-                                    self.logger.info(f"孤立出力ディレクトリ削除: {dirpath}")
-                                else:
-                                    self.logger.info(f"[ドライラン] 孤立出力ディレクトリ削除予定: {dirpath}")
-                        except Exception as e:
-                            self.logger.error(f"孤立ディレクトリ処理エラー {dirpath}: {e}")
+    def _remove_dir(self, dirpath: str) -> int:
+        """
+        ディレクトリを削除し、解放したサイズを返す
+
+        rmコマンドが使える場合はサイズを集計した後、削除をバックグラウンドのrm -rfに任せて完了を待たない
+        （削除に失敗して残ったディレクトリはメタデータに無いため、孤立ディレクトリとして後で削除される）
+
+        Args:
+            dirpath: 削除するディレクトリ
+
+        Returns:
+            削除したファイルの合計サイズ（バイト）
+        """
+        if RM_COMMAND is None:
+            return self._rmtree_with_size(dirpath)
+
+        total_size = self._tree_size(dirpath)
+        # 終了済みのrmプロセスを回収する
+        self._rm_processes = [process for process in self._rm_processes if process.poll() is None]
+        self._rm_processes.append(subprocess.Popen(
+            [RM_COMMAND, '-rf', '--', dirpath],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        ))
+        return total_size
+
+    def _tree_size(self, dirpath: str) -> int:
+        """
+        ディレクトリ以下のファイルの合計サイズを集計する（ディレクトリが存在しない場合は例外）
+
+        Args:
+            dirpath: 集計するディレクトリ
+
+        Returns:
+            ファイルの合計サイズ（バイト）
+        """
+        total_size = 0
+        with os.scandir(dirpath) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    total_size += self._tree_size(entry.path)
+                else:
+                    total_size += entry.stat(follow_symlinks=False).st_size
+        return total_size
+
+    def _rmtree_with_size(self, dirpath: str) -> int:
+        """
+        ディレクトリを再帰的に削除しながら削除したファイルのサイズを集計する
+        （サイズ計算と削除を1回の走査で行う）
+
+        Args:
+            dirpath: 削除するディレクトリ
+
+        Returns:
+            削除したファイルの合計サイズ（バイト）
+        """
+        total_size = 0
+        # 削除中にreaddirが不安定になるファイルシステムがあるため、先に一覧を確定する
+        with os.scandir(dirpath) as it:
+            entries = list(it)
+
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                total_size += self._rmtree_with_size(entry.path)
+            else:
+                total_size += entry.stat(follow_symlinks=False).st_size
+                os.unlink(entry.path)
+
+        os.rmdir(dirpath)
+        return total_size
 
     def _get_dir_size(self, dirpath: str) -> int:
         """ディレクトリのサイズを取得"""
@@ -311,10 +702,9 @@ class FileManager:
             'old_sessions_count': 0
         }
 
-        cutoff_time = datetime.now() - timedelta(hours=self.max_age_hours)
+        cutoff_ts = self._cutoff_ts()
         for session_id, session_data in self.metadata.items():
-            created_at = datetime.fromisoformat(session_data['created_at'])
-            if created_at < cutoff_time:
+            if self._created_at_ts(session_data) < cutoff_ts:
                 stats['old_sessions_count'] += 1
 
         return stats
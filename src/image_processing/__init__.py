@@ -1,6 +1,6 @@
 """
 画像処理モジュール
 """
-from .inpainting import TextInpainter, create_inpainter
+from .inpainting import TextInpainter, create_inpainter, read_image, write_image, compile_jit_kernels
 
-__all__ = ['TextInpainter', 'create_inpainter']
\ No newline at end of file
+__all__ = ['TextInpainter', 'create_inpainter', 'read_image', 'write_image', 'compile_jit_kernels']
\ No newline at end of file
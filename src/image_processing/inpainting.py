@@ -1,11 +1,176 @@
 """
 画像処理モジュール - OpenCVによるインペインティング機能
 """
+import os
+import mmap
+import functools
 import cv2
 import numpy as np
 import logging
+import threading
 from typing import List, Tuple, Optional
 
+try:
+    import numba
+except ImportError:  # numbaは任意依存（未インストール時はNumPy実装を使用）
+    numba = None
+
+# ワーカースレッドごとのマスク用バッファ
+_scratch = threading.local()
+
+
+def _expand_polygons_numpy(points: np.ndarray, expansion_pixels: float) -> np.ndarray:
+    """
+    各多角形の頂点を重心から外側へ拡張（NumPy実装）
+
+    Args:
+        points: 頂点座標 (N, 4, 2) のfloat64配列
+        expansion_pixels: 拡張するピクセル数
+
+    Returns:
+        拡張後の頂点座標 (N, 4, 2) のint32配列
+    """
+    centroids = points.mean(axis=1, keepdims=True)
+    directions = points - centroids
+    norms = np.linalg.norm(directions, axis=2, keepdims=True) + 1e-6
+    return (points + directions / norms * expansion_pixels).astype(np.int32)
+
+
+if numba is not None:
+    @numba.njit
+    def _expand_polygons_jit(points, expansion_pixels):
+        # 中間配列を作らずに1パスで拡張（NumPy実装と同じ演算順序）
+        n, m = points.shape[0], points.shape[1]
+        out = np.empty((n, m, 2), dtype=np.int32)
+        for i in range(n):
+            cx = 0.0
+            cy = 0.0
+            for j in range(m):
+                cx += points[i, j, 0]
+                cy += points[i, j, 1]
+            cx /= m
+            cy /= m
+            for j in range(m):
+                dx = points[i, j, 0] - cx
+                dy = points[i, j, 1] - cy
+                norm = np.sqrt(dx * dx + dy * dy) + 1e-6
+                out[i, j, 0] = np.int32(points[i, j, 0] + dx / norm * expansion_pixels)
+                out[i, j, 1] = np.int32(points[i, j, 1] + dy / norm * expansion_pixels)
+        return out
+
+    expand_polygons = _expand_polygons_jit
+else:
+    expand_polygons = _expand_polygons_numpy
+
+
+def compile_jit_kernels():
+    """
+    Numbaのカーネルを明示的なシグネチャでコンパイルする（numba未インストール時は何もしない）
+
+    ワーカープロセスの初期化時に呼び出し、最初の画像の処理でコンパイルを待たないようにする
+    """
+    if numba is not None:
+        _expand_polygons_jit.compile((numba.float64[:, :, ::1], numba.float64))
+
+
+def read_image(image_path: str) -> Optional[np.ndarray]:
+    """
+    ファイルをメモリマップしてデコード（cv2.imreadの代わり）
+
+    ページキャッシュを直接参照するため、読み込み用の中間バッファへのコピーが発生しない
+
+    Args:
+        image_path: 画像ファイルのパス
+
+    Returns:
+        BGR画像（読み込み・デコードに失敗した場合はNone）
+    """
+    try:
+        with open(image_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            buffer = np.frombuffer(mm, dtype=np.uint8)
+            try:
+                return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+            finally:
+                # mmapを閉じる前にバッファへの参照を解放する
+                del buffer
+    except (OSError, ValueError):
+        # ファイルが存在しない・空の場合（cv2.imreadと同様にNoneを返す）
+        return None
+
+
+# 拡張子ごとのエンコード設定（PNGは圧縮レベルを下げてエンコード時間を優先）
+_ENCODE_PARAMS = {
+    '.png': [cv2.IMWRITE_PNG_COMPRESSION, 1],
+    '.jpg': [cv2.IMWRITE_JPEG_OPTIMIZE, 0],
+    '.jpeg': [cv2.IMWRITE_JPEG_OPTIMIZE, 0],
+}
+
+
+def write_image(image_path: str, image: np.ndarray) -> bool:
+    """
+    画像をメモリ上でエンコードし、バッファ付きの1回の書き込みで保存（cv2.imwriteの代わり）
+
+    Args:
+        image_path: 保存先のパス（拡張子で形式を判定）
+        image: 保存する画像
+
+    Returns:
+        保存に成功したかどうか
+    """
+    ext = os.path.splitext(image_path)[1].lower()
+    ok, buffer = cv2.imencode(ext, image, _ENCODE_PARAMS.get(ext, []))
+    if not ok:
+        return False
+    with open(image_path, 'wb', buffering=1 << 20) as f:
+        f.write(buffer.tobytes())
+    return True
+
+
+@functools.lru_cache(maxsize=1024)
+def _inpaint_radius(image_height: int, avg_text_height: int) -> int:
+    """
+    画像の高さとテキスト領域の平均の高さから半径を算出（結果はメモ化）
+
+    Args:
+        image_height: 画像の高さ
+        avg_text_height: テキスト領域の平均の高さ（整数に切り捨て済み）
+
+    Returns:
+        インペインティング半径
+    """
+    # テキストの高さに基づいて半径を調整
+    base_radius = max(1, int(avg_text_height / 20))
+
+    # 画像サイズによる制限
+    max_radius = min(10, int(image_height / 100))
+
+    return min(base_radius, max_radius)
+
+
+def _scratch_mask(height: int, width: int) -> np.ndarray:
+    """
+    現在のスレッド用のマスクバッファを0で初期化して返す
+
+    バッファは必要なサイズまでしか拡張せず、より小さい画像には
+    先頭部分をビューとして使い回す
+
+    Args:
+        height: マスクの高さ
+        width: マスクの幅
+
+    Returns:
+        スレッドごとに使い回されるマスクバッファ (height, width)
+    """
+    size = height * width
+    buffer = getattr(_scratch, 'buffer', None)
+    if buffer is None or buffer.size < size:
+        buffer = np.empty(size, dtype=np.uint8)
+        _scratch.buffer = buffer
+    mask = buffer[:size].reshape(height, width)
+    mask.fill(0)
+    return mask
+
+
 class TextInpainter:
     """OpenCVを使用してテキストを除去するクラス"""
 
@@ -31,30 +196,32 @@ class TextInpainter:
         else:
             raise ValueError("methodは'ns'または'telea'である必要があります")
 
-    def create_mask(self, image: np.ndarray, bboxes: List[List[List[int]]]) -> np.ndarray:
+    def create_mask(self, image: np.ndarray, bboxes: List[List[List[int]]],
+                    out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         バウンディングボックスからマスクを作成
 
         Args:
             image: 入力画像
             bboxes: バウンディングボックスのリスト [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
+            out: 書き込み先の0初期化済みマスク（Noneの場合は新規作成）
 
         Returns:
             マスク画像（白: テキスト領域, 黒: 背景）
         """
         height, width = image.shape[:2]
-        mask = np.zeros((height, width), dtype=np.uint8)
+        mask = out if out is not None else np.zeros((height, width), dtype=np.uint8)
 
-        for bbox in bboxes:
-            # バウンディングボックスの座標をnumpy配列に変換
-            points = np.array(bbox, dtype=np.int32)
-            # 多角形を塗りつぶし
-            cv2.fillPoly(mask, [points], 255)
+        if bboxes:
+            # 全ての多角形を1回の呼び出しで塗りつぶし
+            polys = [np.asarray(bbox, dtype=np.int32) for bbox in bboxes]
+            cv2.fillPoly(mask, polys, 255)
 
         return mask
 
     def create_enlarged_mask(self, image: np.ndarray, bboxes: List[List[List[int]]],
-                           expansion_pixels: int = 2) -> np.ndarray:
+                           expansion_pixels: int = 2,
+                           out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         拡張されたマスクを作成（より自然な除去のため）
 
@@ -62,30 +229,31 @@ class TextInpainter:
             image: 入力画像
             bboxes: バウンディングボックスのリスト
             expansion_pixels: 拡張するピクセル数
+            out: 書き込み先の0初期化済みマスク（Noneの場合は新規作成）
 
         Returns:
             拡張されたマスク
         """
         height, width = image.shape[:2]
-        mask = np.zeros((height, width), dtype=np.uint8)
+        mask = out if out is not None else np.zeros((height, width), dtype=np.uint8)
 
-        for bbox in bboxes:
-            # バウンディングボックスの座標をnumpy配列に変換
-            points = np.array(bbox, dtype=np.int32)
+        if not bboxes:
+            return mask
 
-            # バウンディングボックスを少し拡張
-            centroid = np.mean(points, axis=0)
-            expanded_points = []
-
-            for point in points:
-                # 中心から外側に拡張
-                direction = point - centroid
-                direction_norm = direction / (np.linalg.norm(direction) + 1e-6)
-                expanded_point = point + direction_norm * expansion_pixels
-                expanded_points.append(expanded_point)
+        # 全バウンディングボックスを (N, 4, 2) の配列にまとめ、中心から外側に一括で拡張
+        try:
+            points = np.asarray(bboxes, dtype=np.int32).astype(np.float64)
+        except ValueError:
+            # 頂点数の異なる多角形が混在する場合は1つずつ拡張する
+            expanded = [
+                expand_polygons(np.asarray([bbox], dtype=np.int32).astype(np.float64),
+                                float(expansion_pixels))[0]
+                for bbox in bboxes
+            ]
+        else:
+            expanded = list(expand_polygons(points, float(expansion_pixels)))
 
-            expanded_points = np.array(expanded_points, dtype=np.int32)
-            cv2.fillPoly(mask, [expanded_points], 255)
+        cv2.fillPoly(mask, expanded, 255)
 
         return mask
 
@@ -100,24 +268,61 @@ class TextInpainter:
             use_enlarged_mask: 拡張マスクを使用するかどうか
 
         Returns:
-            テキストが除去された画像
+            テキストが除去された画像（除去対象がない場合やエラー時は入力画像そのもの）
         """
+        if not bboxes:
+            return image
+
         try:
-            # マスクの作成
+            # マスクの作成（スレッドごとのバッファを再利用）
+            scratch = _scratch_mask(*image.shape[:2])
             if use_enlarged_mask:
-                mask = self.create_enlarged_mask(image, bboxes)
+                mask = self.create_enlarged_mask(image, bboxes, out=scratch)
             else:
-                mask = self.create_mask(image, bboxes)
+                mask = self.create_mask(image, bboxes, out=scratch)
+
+            # 画像外のボックスのみでマスクが空の場合はインペインティング不要
+            if not mask.any():
+                return image
 
             # インペインティング実行
-            result = cv2.inpaint(image, mask, self.inpaint_radius, self.cv2_method)
+            result = self._inpaint_roi(image, mask)
 
             self.logger.info(f"Removed text from {len(bboxes)} regions")
             return result
 
         except Exception as e:
             self.logger.error(f"テキスト除去エラー: {e}")
-            return image.copy()  # エラー時は元の画像を返す
+            return image  # エラー時は元の画像をそのまま返す
+
+    def _inpaint_roi(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """
+        マスクの外接矩形（半径分の余白付き）だけをインペインティング
+
+        cv2.inpaintは半径内の近傍しか参照しないため、余白を取れば
+        画像全体を処理した場合と同じ結果になる
+
+        Args:
+            image: 入力画像
+            mask: マスク画像
+
+        Returns:
+            インペインティングされた画像
+        """
+        x, y, w, h = cv2.boundingRect(mask)
+        if w == 0 or h == 0:
+            # 空のマスクに対するインペインティングは単なるコピーと同じ
+            return image.copy()
+
+        height, width = mask.shape[:2]
+        margin = self.inpaint_radius + 2
+        x0, y0 = max(0, x - margin), max(0, y - margin)
+        x1, y1 = min(width, x + w + margin), min(height, y + h + margin)
+
+        result = image.copy()
+        result[y0:y1, x0:x1] = cv2.inpaint(image[y0:y1, x0:x1], mask[y0:y1, x0:x1],
+                                           self.inpaint_radius, self.cv2_method)
+        return result
 
     def remove_text_single_region(self, image: np.ndarray, bbox: List[List[int]]) -> np.ndarray:
         """
@@ -146,14 +351,14 @@ class TextInpainter:
             テキストが除去された画像
         """
         try:
-            image = cv2.imread(image_path)
+            image = read_image(image_path)
             if image is None:
                 raise ValueError(f"画像が読み込めません: {image_path}")
 
             result = self.remove_text(image, bboxes)
 
             if output_path:
-                cv2.imwrite(output_path, result)
+                write_image(output_path, result)
                 self.logger.info(f"結果を保存しました: {output_path}")
 
             return result
@@ -173,7 +378,7 @@ class TextInpainter:
             blend_alpha: ブレンド係数（0に近いほど元の画像に近い）
 
         Returns:
-            ブレンドされた画像
+            ブレンドされた画像（エラー時はinpainted_imageそのもの）
         """
         try:
             # 画像サイズの確認
@@ -188,7 +393,7 @@ class TextInpainter:
 
         except Exception as e:
             self.logger.error(f"ブレンド処理エラー: {e}")
-            return inpainted_image.copy()
+            return inpainted_image
 
     def preview_mask(self, image: np.ndarray, mask: np.ndarray) -> np.ndarray:
         """
@@ -199,7 +404,7 @@ class TextInpainter:
             mask: マスク画像
 
         Returns:
-            マスクが重ねられた画像
+            マスクが重ねられた画像（エラー時は入力画像そのもの）
         """
         try:
             # マスクをカラーに変換
@@ -213,7 +418,7 @@ class TextInpainter:
 
         except Exception as e:
             self.logger.error(f"マスクプレビューエラー: {e}")
-            return image.copy()
+            return image
 
     def estimate_best_inpaint_radius(self, image: np.ndarray, bboxes: List[List[List[int]]]) -> int:
         """
@@ -230,22 +435,11 @@ class TextInpainter:
             if not bboxes:
                 return 3  # デフォルト値
 
-            # テキスト領域の平均サイズを計算
-            heights = []
-            for bbox in bboxes:
-                height = abs(bbox[2][1] - bbox[0][1])  # 高さを計算
-                heights.append(height)
-
-            avg_height = np.mean(heights)
-
-            # 画像の高さに基づいて半径を調整
-            image_height = image.shape[0]
-            base_radius = max(1, int(avg_height / 20))
-
-            # 画像サイズによる制限
-            max_radius = min(10, int(image_height / 100))
+            # テキスト領域の平均の高さを計算（頂点数の異なる多角形が混在しても使えるよう、ボックスごとに2頂点だけ参照する）
+            avg_height = np.mean([abs(bbox[2][1] - bbox[0][1]) for bbox in bboxes])
 
-            return min(base_radius, max_radius)
+            # 切り捨てても半径の計算結果は変わらないため整数でメモ化する
+            return _inpaint_radius(int(image.shape[0]), int(avg_height))
 
         except Exception as e:
             self.logger.error(f"半径推定エラー: {e}")
@@ -277,7 +471,7 @@ if __name__ == "__main__":
     ]
 
     # ダミー画像でテスト
-    test_image = np.ones((300, 400, 3), dtype=np.uint8) * 255  # 白い画像
+    test_image = np.full((300, 400, 3), 255, dtype=np.uint8)  # 白い画像
     cv2.putText(test_image, "Test Text", (60, 70), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
 
     # インペインターの作成
@@ -292,8 +486,8 @@ if __name__ == "__main__":
     print(f"テキスト除去完了。結果形状: {result.shape}")
 
     # 結果保存
-    cv2.imwrite("test_original.png", test_image)
-    cv2.imwrite("test_mask.png", mask)
-    cv2.imwrite("test_result.png", result)
+    write_image("test_original.png", test_image)
+    write_image("test_mask.png", mask)
+    write_image("test_result.png", result)
 
     print("テスト完了")
\ No newline at end of file
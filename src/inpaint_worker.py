@@ -0,0 +1,59 @@
+"""
+テキスト除去・再描画ワーカー - ProcessPoolExecutorのワーカープロセスで使用する関数
+
+spawnで起動したワーカーが読み込むため、画像処理とテキスト描画以外のモジュール
+（OCR・翻訳・Webサーバー関連）には依存しない。
+"""
+import logging
+
+from .image_processing import TextInpainter, read_image, write_image, compile_jit_kernels
+from .text_rendering import TextRenderer
+
+logger = logging.getLogger(__name__)
+
+# ワーカープロセス内で使用するコンポーネント（init_inpaint_workerで初期化）
+_inpainter = None
+_renderer = None
+
+
+def init_inpaint_worker(font_path):
+    """
+    ワーカープロセスの初期化（インペインターとレンダラーをプロセスごとに作成）
+
+    Args:
+        font_path: 描画に使用するフォントファイルのパス
+    """
+    global _inpainter, _renderer
+    # マスク作成のJITカーネルを最初の画像の前にコンパイルしておく
+    compile_jit_kernels()
+    _inpainter = TextInpainter(
+        method='ns',
+        inpaint_radius=3
+    )
+    _renderer = TextRenderer(
+        font_path=font_path,
+        default_font_size=12
+    )
+
+
+def inpaint_and_render(image_path, bboxes, text_data, output_path):
+    """
+    画像を読み込み、テキスト除去・再描画・保存を行う
+
+    Args:
+        image_path: 入力画像のパス
+        bboxes: 除去するテキスト領域のリスト
+        text_data: 描画するテキスト情報のリスト
+        output_path: 保存先のパス
+
+    Returns:
+        保存に成功したかどうか
+    """
+    original_image = read_image(image_path)
+    if original_image is None:
+        logger.error(f"画像の読み込みに失敗: {image_path}")
+        return False
+
+    inpainted_image = _inpainter.remove_text(original_image, bboxes)
+    result_image = _renderer.batch_render_text(inpainted_image, text_data)
+    return write_image(output_path, result_image)
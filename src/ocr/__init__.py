@@ -1,6 +1,6 @@
 """
 OCRモジュール
 """
-from .text_extractor import TextExtractor, create_mask_from_bboxes
+from .text_extractor import TextExtractor, create_mask_from_bboxes, get_reader
 
-__all__ = ['TextExtractor', 'create_mask_from_bboxes']
\ No newline at end of file
+__all__ = ['TextExtractor', 'create_mask_from_bboxes', 'get_reader']
\ No newline at end of file
@@ -3,10 +3,48 @@ OCRモジュール - EasyOCRを使用したテキスト抽出機能
 """
 import cv2
 import numpy as np
+import os
 import easyocr
+import threading
 from typing import List, Dict, Tuple, Optional
 import logging
 
+from ..image_processing import read_image, write_image
+
+# バッチ推論でサイズの異なる画像をまとめるため、縦横をこの倍数に切り上げたサイズへパディングする
+BATCH_PAD_STEP = 128
+
+# プロセス全体で共有するEasyOCRリーダー（(ソート済み言語, gpu)をキーとする）
+_READERS: Dict[Tuple[Tuple[str, ...], bool], easyocr.Reader] = {}
+# 同じキーのリーダーが同時に初期化されないようにするロック
+_READERS_LOCK = threading.Lock()
+
+
+def get_reader(languages: List[str], gpu: bool = True) -> easyocr.Reader:
+    """
+    言語設定とGPU設定に対応する共有EasyOCRリーダーを取得（未作成の場合は作成）
+
+    Args:
+        languages: 認識する言語のリスト
+        gpu: GPUを使用するかどうか
+
+    Returns:
+        EasyOCRリーダー
+    """
+    key = (tuple(sorted(languages)), gpu)
+    reader = _READERS.get(key)
+    if reader is not None:
+        return reader
+
+    with _READERS_LOCK:
+        # ロック待ちの間に他の呼び出し元が作成している場合はそれを使う
+        reader = _READERS.get(key)
+        if reader is None:
+            reader = easyocr.Reader(list(languages), gpu=gpu, cudnn_benchmark=gpu)
+            _READERS[key] = reader
+    return reader
+
+
 class TextExtractor:
     """EasyOCRを使用して画像からテキストを抽出するクラス"""
 
@@ -31,12 +69,68 @@ class TextExtractor:
         """EasyOCRリーダーの初期化"""
         try:
             self.logger.info(f"Initializing EasyOCR with languages: {self.languages}")
-            self.reader = easyocr.Reader(self.languages, gpu=self.gpu)
+            self.reader = get_reader(self.languages, gpu=self.gpu)
             self.logger.info("EasyOCR initialized successfully")
         except Exception as e:
             self.logger.error(f"Failed to initialize EasyOCR: {e}")
             raise
 
+    def _structure_results(self, results, scale: Tuple[float, float] = (1.0, 1.0),
+                           bounds: Optional[Tuple[int, int]] = None) -> List[Dict]:
+        """
+        EasyOCRの検出結果を辞書のリストに整形
+
+        Args:
+            results: EasyOCRの結果 [(bbox, text, confidence), ...]
+            scale: 座標に掛けるスケール (x方向, y方向)
+            bounds: 座標を収める画像サイズ (幅, 高さ)（パディングした画像の結果を元の画像に収める場合に指定）
+
+        Returns:
+            抽出結果のリスト
+        """
+        scale = np.asarray(scale, dtype=np.float64)
+        extracted_data = []
+        for bbox, text, confidence in results:
+            # バウンディングボックスの座標を整数に変換（NumPyで一括変換）
+            points = np.asarray(bbox, dtype=np.float64) * scale
+            if bounds is not None:
+                points = np.clip(points, 0, (bounds[0] - 1, bounds[1] - 1))
+            bbox_int = points.astype(np.int32).tolist()
+
+            # 位置情報の抽出
+            top_left = tuple(bbox_int[0])
+            bottom_right = tuple(bbox_int[2])
+
+            extracted_data.append({
+                'text': text.strip(),
+                'confidence': float(confidence),
+                'bbox': bbox_int,
+                'position': {
+                    'top_left': top_left,
+                    'bottom_right': bottom_right,
+                    'width': bottom_right[0] - top_left[0],
+                    'height': bottom_right[1] - top_left[1]
+                }
+            })
+
+        return extracted_data
+
+    def warmup(self, batch_size: int = 8, height: int = 600, width: int = 800):
+        """
+        ダミー入力で推論を実行してCUDNNのカーネル選択を済ませる
+
+        Args:
+            batch_size: バッチサイズ
+            height: ダミー画像の高さ
+            width: ダミー画像の幅
+        """
+        try:
+            dummy = np.zeros([batch_size, height, width, 3], dtype=np.uint8)
+            self.reader.readtext_batched(dummy, batch_size=batch_size)
+            self.logger.info(f"EasyOCR warmup completed: {batch_size}x{height}x{width}")
+        except Exception as e:
+            self.logger.warning(f"EasyOCR warmup failed: {e}")
+
     def extract_text(self, image_path: str) -> List[Dict]:
         """
         画像からテキストを抽出
@@ -53,7 +147,7 @@ class TextExtractor:
         """
         try:
             # 画像の読み込み
-            image = cv2.imread(image_path)
+            image = read_image(image_path)
             if image is None:
                 raise ValueError(f"Could not read image: {image_path}")
 
@@ -61,26 +155,7 @@ class TextExtractor:
             results = self.reader.readtext(image)
 
             # 結果の構造化
-            extracted_data = []
-            for bbox, text, confidence in results:
-                # バウンディングボックスの座標を整数に変換
-                bbox_int = [list(map(int, point)) for point in bbox]
-
-                # 位置情報の抽出
-                top_left = tuple(map(int, bbox[0]))
-                bottom_right = tuple(map(int, bbox[2]))
-
-                extracted_data.append({
-                    'text': text.strip(),
-                    'confidence': float(confidence),
-                    'bbox': bbox_int,
-                    'position': {
-                        'top_left': top_left,
-                        'bottom_right': bottom_right,
-                        'width': bottom_right[0] - top_left[0],
-                        'height': bottom_right[1] - top_left[1]
-                    }
-                })
+            extracted_data = self._structure_results(results)
 
             self.logger.info(f"Extracted {len(extracted_data)} text regions from {image_path}")
             return extracted_data
@@ -89,6 +164,82 @@ class TextExtractor:
             self.logger.error(f"Error extracting text from {image_path}: {e}")
             return []
 
+    def extract_text_batched(self, image_paths: List[str], n_width: int = None,
+                             n_height: int = None, batch_size: int = 8,
+                             images: Dict[str, np.ndarray] = None,
+                             pad_step: int = BATCH_PAD_STEP) -> Dict[str, List[Dict]]:
+        """
+        複数の画像からまとめてテキストを抽出（readtext_batched）
+
+        n_width/n_heightを指定しない場合は、縦横をpad_stepの倍数に切り上げたサイズごとに
+        グループ化し、右端・下端を黒でパディングしてからバッチ推論を行う（座標はそのまま使える）。
+        指定した場合は全画像をそのサイズにリサイズし、座標を元の画像サイズに戻す。
+
+        Args:
+            image_paths: 画像ファイルパスのリスト
+            n_width: リサイズ後の幅（オプション）
+            n_height: リサイズ後の高さ（オプション）
+            batch_size: EasyOCRのバッチサイズ
+            images: 読み込み済みの画像（パスをキーとした辞書）。含まれないパスはファイルから読み込む
+            pad_step: パディング後のサイズの刻み（0の場合はパディングせず同じサイズの画像のみをまとめる）
+
+        Returns:
+            画像パスをキーとした抽出結果の辞書（読み込みに失敗した画像は空リスト）
+        """
+        results_by_path = {path: [] for path in image_paths}
+
+        # サイズごとにグループ化（読み込み済みでない画像はファイルから読み込む）
+        preloaded = images or {}
+        groups: Dict[Tuple[int, int], List[Tuple[str, np.ndarray]]] = {}
+        for path in image_paths:
+            image = preloaded.get(path)
+            if image is None:
+                image = read_image(path)
+            if image is None:
+                self.logger.error(f"Could not read image: {path}")
+                continue
+            if n_width and n_height:
+                key = (n_height, n_width)
+            elif pad_step:
+                key = tuple(-(-size // pad_step) * pad_step for size in image.shape[:2])
+            else:
+                key = image.shape[:2]
+            groups.setdefault(key, []).append((path, image))
+
+        for (height, width), items in groups.items():
+            try:
+                if n_width and n_height:
+                    batch_images = [image for _, image in items]
+                else:
+                    batch_images = [
+                        cv2.copyMakeBorder(image, 0, height - image.shape[0], 0, width - image.shape[1],
+                                           cv2.BORDER_CONSTANT, value=0)
+                        for _, image in items
+                    ]
+                if n_width and n_height:
+                    batch_results = self.reader.readtext_batched(
+                        batch_images, n_width=n_width, n_height=n_height, batch_size=batch_size
+                    )
+                else:
+                    batch_results = self.reader.readtext_batched(batch_images, batch_size=batch_size)
+
+                for (path, image), results in zip(items, batch_results):
+                    if n_width and n_height:
+                        # リサイズした場合は元の画像座標に戻す
+                        scale = (image.shape[1] / width, image.shape[0] / height)
+                        results_by_path[path] = self._structure_results(results, scale)
+                    else:
+                        # パディング領域にはみ出した座標を元の画像内に収める
+                        results_by_path[path] = self._structure_results(
+                            results, bounds=(image.shape[1], image.shape[0])
+                        )
+                    self.logger.info(f"Extracted {len(results_by_path[path])} text regions from {path}")
+
+            except Exception as e:
+                self.logger.error(f"Error in batched extraction ({width}x{height}): {e}")
+
+        return results_by_path
+
     def extract_text_from_image(self, image: np.ndarray) -> List[Dict]:
         """
         numpy配列から直接テキストを抽出
@@ -101,26 +252,7 @@ class TextExtractor:
         """
         try:
             results = self.reader.readtext(image)
-
-            extracted_data = []
-            for bbox, text, confidence in results:
-                bbox_int = [list(map(int, point)) for point in bbox]
-                top_left = tuple(map(int, bbox[0]))
-                bottom_right = tuple(map(int, bbox[2]))
-
-                extracted_data.append({
-                    'text': text.strip(),
-                    'confidence': float(confidence),
-                    'bbox': bbox_int,
-                    'position': {
-                        'top_left': top_left,
-                        'bottom_right': bottom_right,
-                        'width': bottom_right[0] - top_left[0],
-                        'height': bottom_right[1] - top_left[1]
-                    }
-                })
-
-            return extracted_data
+            return self._structure_results(results)
 
         except Exception as e:
             self.logger.error(f"Error extracting text from image array: {e}")
@@ -138,7 +270,7 @@ class TextExtractor:
             検出結果が描画された画像
         """
         try:
-            image = cv2.imread(image_path)
+            image = read_image(image_path)
             results = self.extract_text(image_path)
 
             # 検出結果を描画
@@ -160,8 +292,10 @@ class TextExtractor:
                            0.7, (0, 255, 0), 2)
 
             if output_path:
-                cv2.imwrite(output_path, image)
-                self.logger.info(f"Visualization saved to {output_path}")
+                if write_image(output_path, image):
+                    self.logger.info(f"Visualization saved to {output_path}")
+                else:
+                    self.logger.error(f"Failed to save visualization to {output_path}")
 
             return image
 
@@ -184,9 +318,8 @@ def create_mask_from_bboxes(image_shape: Tuple[int, int], bboxes: List[List[List
     height, width = image_shape[:2]
     mask = np.zeros((height, width), dtype=np.uint8)
 
-    for bbox in bboxes:
-        points = np.array(bbox, dtype=np.int32)
-        cv2.fillPoly(mask, [points], 255)
+    if bboxes:
+        cv2.fillPoly(mask, [np.asarray(bbox, dtype=np.int32) for bbox in bboxes], 255)
 
     return mask
 
@@ -198,7 +331,6 @@ if __name__ == "__main__":
     # テスト画像があれば実行
     test_image = "test_image.jpg"  # 実際の画像パスを指定
 
-    import os
     if os.path.exists(test_image):
         results = extractor.extract_text(test_image)
         print(f"検出されたテキスト数: {len(results)}")
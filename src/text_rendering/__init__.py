@@ -1,6 +1,6 @@
 """
 テキスト再描画モジュール
 """
-from .text_renderer import TextRenderer, create_renderer
+from .text_renderer import TextRenderer, AxisAlignedBBox, normalize_bbox, create_renderer
 
-__all__ = ['TextRenderer', 'create_renderer']
\ No newline at end of file
+__all__ = ['TextRenderer', 'AxisAlignedBBox', 'normalize_bbox', 'create_renderer']
\ No newline at end of file
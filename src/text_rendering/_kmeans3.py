@@ -0,0 +1,113 @@
+"""
+3次元（色空間）専用のK-means - Numbaが利用可能な場合のみJITコンパイルして使用する
+"""
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # numbaは任意依存（未インストール時はscikit-learnを使用）
+    numba = None
+
+HAS_NUMBA = numba is not None
+
+
+def _kmeans3(pixels, k, n_iter=20, seed=42):
+    """
+    3次元の点群をk個のクラスタに分類（k-means++で初期化したLloyd法）
+
+    Args:
+        pixels: 点群 (N, 3) のfloat64配列
+        k: クラスタ数（N以下）
+        n_iter: 最大反復回数
+        seed: 初期化に使う乱数シード
+
+    Returns:
+        (クラスタ中心 (k, 3), 各点のラベル (N,))
+    """
+    n = pixels.shape[0]
+    np.random.seed(seed)
+    centers = np.empty((k, 3), dtype=np.float64)
+    labels = np.zeros(n, dtype=np.int64)
+
+    # k-means++による初期化
+    first = np.random.randint(n)
+    centers[0, 0] = pixels[first, 0]
+    centers[0, 1] = pixels[first, 1]
+    centers[0, 2] = pixels[first, 2]
+    min_dist = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        dr = pixels[i, 0] - centers[0, 0]
+        dg = pixels[i, 1] - centers[0, 1]
+        db = pixels[i, 2] - centers[0, 2]
+        min_dist[i] = dr * dr + dg * dg + db * db
+
+    for j in range(1, k):
+        total = min_dist.sum()
+        chosen = n - 1
+        if total > 0.0:
+            threshold = np.random.random() * total
+            acc = 0.0
+            for i in range(n):
+                acc += min_dist[i]
+                if acc >= threshold:
+                    chosen = i
+                    break
+        else:
+            chosen = np.random.randint(n)
+
+        centers[j, 0] = pixels[chosen, 0]
+        centers[j, 1] = pixels[chosen, 1]
+        centers[j, 2] = pixels[chosen, 2]
+        for i in range(n):
+            dr = pixels[i, 0] - centers[j, 0]
+            dg = pixels[i, 1] - centers[j, 1]
+            db = pixels[i, 2] - centers[j, 2]
+            d = dr * dr + dg * dg + db * db
+            if d < min_dist[i]:
+                min_dist[i] = d
+
+    # Lloyd法
+    sums = np.empty((k, 3), dtype=np.float64)
+    counts = np.empty(k, dtype=np.int64)
+    for iteration in range(n_iter):
+        changed = False
+        for i in range(n):
+            best = 0
+            best_dist = np.inf
+            for j in range(k):
+                dr = pixels[i, 0] - centers[j, 0]
+                dg = pixels[i, 1] - centers[j, 1]
+                db = pixels[i, 2] - centers[j, 2]
+                d = dr * dr + dg * dg + db * db
+                if d < best_dist:
+                    best_dist = d
+                    best = j
+            if labels[i] != best or iteration == 0:
+                changed = True
+                labels[i] = best
+
+        if not changed:
+            break
+
+        sums[:, :] = 0.0
+        counts[:] = 0
+        for i in range(n):
+            j = labels[i]
+            sums[j, 0] += pixels[i, 0]
+            sums[j, 1] += pixels[i, 1]
+            sums[j, 2] += pixels[i, 2]
+            counts[j] += 1
+        for j in range(k):
+            # 空になったクラスタは中心を維持する
+            if counts[j] > 0:
+                centers[j, 0] = sums[j, 0] / counts[j]
+                centers[j, 1] = sums[j, 1] / counts[j]
+                centers[j, 2] = sums[j, 2] / counts[j]
+
+    return centers, labels
+
+
+if HAS_NUMBA:
+    kmeans3 = numba.njit(fastmath=True)(_kmeans3)
+else:
+    kmeans3 = _kmeans3
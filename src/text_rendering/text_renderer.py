@@ -6,8 +6,75 @@ import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 import os
 import logging
-from typing import List, Tuple, Optional, Dict, Any
-from sklearn.cluster import KMeans
+import functools
+from dataclasses import dataclass
+from typing import List, Tuple, Optional, Dict, Any, Union
+from sklearn.cluster import MiniBatchKMeans
+
+try:
+    from ._kmeans3 import HAS_NUMBA, kmeans3
+except ImportError:  # モジュールを直接実行した場合
+    from _kmeans3 import HAS_NUMBA, kmeans3
+
+# リポジトリ同梱のフォント（モジュールの読み込み時に1回だけパスを解決する）
+BUNDLED_FONT_PATH = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'fonts', 'NotoSansJP-Regular.ttf'))
+
+
+@dataclass(frozen=True)
+class AxisAlignedBBox:
+    """軸に平行な矩形のバウンディングボックス"""
+    x_min: int
+    y_min: int
+    x_max: int
+    y_max: int
+
+    @property
+    def width(self) -> int:
+        return self.x_max - self.x_min
+
+    @property
+    def height(self) -> int:
+        return self.y_max - self.y_min
+
+
+BBoxLike = Union[AxisAlignedBBox, List[List[int]]]
+
+
+def normalize_bbox(bbox: BBoxLike) -> AxisAlignedBBox:
+    """
+    4点のバウンディングボックスを軸に平行な矩形に変換
+
+    Args:
+        bbox: バウンディングボックス [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
+              （AxisAlignedBBoxの場合はそのまま返す）
+
+    Returns:
+        AxisAlignedBBox
+    """
+    if isinstance(bbox, AxisAlignedBBox):
+        return bbox
+    xs = [int(p[0]) for p in bbox]
+    ys = [int(p[1]) for p in bbox]
+    return AxisAlignedBBox(min(xs), min(ys), max(xs), max(ys))
+
+
+@functools.lru_cache(maxsize=128)
+def _load_font(font_path: Optional[str], size: int) -> ImageFont.FreeTypeFont:
+    """
+    (フォントパス, サイズ)ごとにフォントを読み込む（TTFの再読み込みを避けるためキャッシュする）
+
+    Args:
+        font_path: フォントファイルのパス
+        size: フォントサイズ
+
+    Returns:
+        フォント（ファイルが無い場合はデフォルトフォント）
+    """
+    if font_path and os.path.exists(font_path):
+        return ImageFont.truetype(font_path, size)
+    return ImageFont.load_default()
+
 
 class TextRenderer:
     """Pillowを使用して翻訳テキストを描画するクラス"""
@@ -24,6 +91,17 @@ class TextRenderer:
         self.default_font_size = default_font_size
         self.logger = logging.getLogger(__name__)
 
+        # (フォント, 文字列)ごとのバウンディングボックス（同じ文字列の再計測を避ける）
+        self._get_bbox = functools.lru_cache(maxsize=4096)(self._measure_bbox)
+        # (フォント, 文字)ごとの送り幅（折り返し位置の見積もりに使う）
+        self._get_advance = functools.lru_cache(maxsize=8192)(self._measure_advance)
+        # (フォント, 行, 縁取りの太さ)ごとのラスタライズ済みマスク（同じ行の再ラスタライズを避ける）
+        self._get_line_mask = functools.lru_cache(maxsize=1024)(self._rasterize_line)
+        # (フォント, 文字列, 最大幅)ごとの折り返し結果（フォントサイズ探索と描画で同じ計算を繰り返さない）
+        self._get_wrapped = functools.lru_cache(maxsize=2048)(self._wrap_uncached)
+        # (文字列, 目標幅, 目標高さ, サイズ範囲)ごとの最適なフォントサイズ（同じ領域の再探索を避ける）
+        self._get_optimal_font_size = functools.lru_cache(maxsize=1024)(self._search_font_size)
+
         # フォントの初期化
         self.font = None
         self._initialize_font()
@@ -32,7 +110,7 @@ class TextRenderer:
         """フォントの初期化"""
         try:
             if self.font_path and os.path.exists(self.font_path):
-                self.font = ImageFont.truetype(self.font_path, self.default_font_size)
+                self.font = self._get_font(self.default_font_size)
                 self.logger.info(f"フォントを読み込みました: {self.font_path}")
             else:
                 raise FileNotFoundError(f"フォントファイルが見つかりません: {self.font_path}")
@@ -40,6 +118,66 @@ class TextRenderer:
             self.logger.error(f"フォントの初期化に失敗: {e}")
             raise
 
+    def _get_font(self, size: int) -> ImageFont.FreeTypeFont:
+        """
+        指定サイズのフォントを取得（_load_fontで全インスタンス共通にキャッシュされる）
+
+        Args:
+            size: フォントサイズ
+
+        Returns:
+            フォント
+        """
+        return _load_font(self.font_path, size)
+
+    @staticmethod
+    def _measure_bbox(font: ImageFont.FreeTypeFont, text: str) -> Tuple[int, int, int, int]:
+        """
+        文字列のバウンディングボックスを計測する（_get_bboxでキャッシュされる）
+
+        Args:
+            font: フォント
+            text: 文字列
+
+        Returns:
+            (left, top, right, bottom)
+        """
+        return font.getbbox(text)
+
+    @staticmethod
+    def _measure_advance(font: ImageFont.FreeTypeFont, char: str) -> float:
+        """
+        1文字の送り幅を計測する（_get_advanceでキャッシュされる）
+
+        Args:
+            font: フォント
+            char: 文字
+
+        Returns:
+            送り幅（ピクセル）
+        """
+        return font.getlength(char)
+
+    @staticmethod
+    def _rasterize_line(font: ImageFont.FreeTypeFont, line: str,
+                        stroke_width: int) -> Tuple[Tuple[int, int], Image.Image]:
+        """
+        1行分のテキストをグレースケールのマスクにラスタライズする（_get_line_maskでキャッシュされる）
+
+        Args:
+            font: フォント
+            line: 1行分のテキスト
+            stroke_width: 縁取りの太さ（0の場合は文字本体のみ）
+
+        Returns:
+            (描画位置からのオフセット (x, y), マスク画像)
+        """
+        left, top, right, bottom = font.getbbox(line, stroke_width=stroke_width)
+        mask = Image.new('L', (max(1, right - left), max(1, bottom - top)), 0)
+        ImageDraw.Draw(mask).text((-left, -top), line, fill=255, font=font,
+                                  stroke_width=stroke_width, stroke_fill=255)
+        return (left, top), mask
+
     def set_font_size(self, size: int):
         """
         フォントサイズを設定
@@ -49,7 +187,7 @@ class TextRenderer:
         """
         try:
             if self.font_path and os.path.exists(self.font_path):
-                self.font = ImageFont.truetype(self.font_path, size)
+                self.font = self._get_font(size)
             else:
                 # デフォルトフォントではサイズ変更が難しいのでログのみ
                 self.logger.warning("デフォルトフォントのためサイズ変更は制限されます")
@@ -71,33 +209,63 @@ class TextRenderer:
         if font is None:
             font = self.font
 
-        lines = []
-        current_line = ""
+        return list(self._get_wrapped(font, text, max_width))
 
-        # 1文字ずつ処理
-        for char in text:
-            # 現在の行に文字を追加した場合の幅を計算
-            test_line = current_line + char
-            bbox = font.getbbox(test_line)
-            text_width = bbox[2] - bbox[0]
+    def _wrap_uncached(self, font: ImageFont.FreeTypeFont, text: str, max_width: int) -> Tuple[str, ...]:
+        """
+        テキストを指定幅に合わせて折り返す（_get_wrappedでキャッシュされる）
 
-            if text_width <= max_width:
-                current_line = test_line
-            else:
-                # 幅を超える場合は現在の行を確定して新しい行を開始
-                if current_line:
-                    lines.append(current_line)
-                    current_line = char
-                else:
-                    # 1文字で幅を超える場合（非常に小さいmax_width）
-                    lines.append(char)
-                    current_line = ""
+        Args:
+            font: 使用するフォント
+            text: 折り返すテキスト
+            max_width: 最大幅（ピクセル）
+
+        Returns:
+            折り返されたテキストの行（タプル）
+        """
+        if not text:
+            return ()
 
-        # 最後の行を追加
-        if current_line:
-            lines.append(current_line)
+        # 文字ごとの送り幅の累積和で折り返し位置の候補を求め、
+        # 実際の描画幅（getbbox）で前後に補正する
+        advances = [self._get_advance(font, char) for char in text]
+        cumulative = np.concatenate(([0.0], np.cumsum(advances)))
 
-        return lines
+        def fits(start: int, end: int) -> bool:
+            bbox = self._get_bbox(font, text[start:end])
+            return bbox[2] - bbox[0] <= max_width
+
+        lines = []
+        start = 0
+        length = len(text)
+        while start < length:
+            # 送り幅の合計がmax_width以下となる最長の範囲
+            end = int(np.searchsorted(cumulative, cumulative[start] + max_width, side='right')) - 1
+            end = min(max(end, start + 1), length)
+            while end < length and fits(start, end + 1):
+                end += 1
+            while end > start + 1 and not fits(start, end):
+                end -= 1
+
+            next_start = end
+            # 英単語の途中で折り返す場合は直前の半角スペースで改行する
+            if end < length and self._is_ascii_word_char(text[end - 1]) and self._is_ascii_word_char(text[end]):
+                space = text.rfind(' ', start + 1, end)
+                if space != -1:
+                    end = space
+                    next_start = space + 1
+            elif end < length and text[end] == ' ':
+                next_start = end + 1
+
+            lines.append(text[start:end])
+            start = next_start
+
+        return tuple(lines)
+
+    @staticmethod
+    def _is_ascii_word_char(char: str) -> bool:
+        """半角英数字（単語の途中で折り返したくない文字）かどうか"""
+        return char.isascii() and char.isalnum()
 
     def calculate_text_dimensions(self, text: str, font: ImageFont.FreeTypeFont = None) -> Tuple[int, int]:
         """
@@ -114,7 +282,7 @@ class TextRenderer:
             font = self.font
 
         try:
-            bbox = font.getbbox(text)
+            bbox = self._get_bbox(font, text)
             width = bbox[2] - bbox[0]
             height = bbox[3] - bbox[1]
             return width, height
@@ -122,6 +290,18 @@ class TextRenderer:
             self.logger.error(f"テキスト寸法の計算に失敗: {e}")
             return 100, 20  # デフォルト値
 
+    def _line_height(self, font: ImageFont.FreeTypeFont) -> int:
+        """
+        1行あたりの高さ（全角文字「あ」の高さ、フォントごとに一定）
+
+        Args:
+            font: フォント
+
+        Returns:
+            行の高さ（ピクセル）
+        """
+        return self.calculate_text_dimensions("あ", font)[1]
+
     def find_optimal_font_size(self, text: str, target_width: int, target_height: int,
                              min_size: int = 8, max_size: int = 72) -> int:
         """
@@ -137,78 +317,110 @@ class TextRenderer:
         Returns:
             最適なフォントサイズ
         """
+        return self._get_optimal_font_size(text, target_width, target_height, min_size, max_size)
+
+    def _search_font_size(self, text: str, target_width: int, target_height: int,
+                          min_size: int, max_size: int) -> int:
+        """
+        収まる最大のフォントサイズを二分探索する（_get_optimal_font_sizeでキャッシュされる）
+
+        Args:
+            text: 描画するテキスト
+            target_width: 目標幅
+            target_height: 目標高さ
+            min_size: 最小フォントサイズ
+            max_size: 最大フォントサイズ
+
+        Returns:
+            最適なフォントサイズ
+        """
+        # サイズが大きいほど描画領域も大きくなるため、収まる最大サイズを二分探索する
         best_size = min_size
-        best_fit_score = float('inf')
+        low, high = min_size, max_size
 
-        for size in range(min_size, max_size + 1):
+        while low <= high:
+            size = (low + high) // 2
             try:
-                if self.font_path and os.path.exists(self.font_path):
-                    font = ImageFont.truetype(self.font_path, size)
-                else:
-                    font = ImageFont.load_default()
+                font = self._get_font(size)
 
                 # テキストを折り返して寸法を計算
                 lines = self.wrap_text(text, target_width, font)
-                total_height = len(lines) * self.calculate_text_dimensions("あ", font)[1]
+                total_height = len(lines) * self._line_height(font)
+                max_width = max(self.calculate_text_dimensions(line, font)[0] for line in lines) if lines else 0
 
-                # フィットスコアを計算（小さいほど良い）
-                width_fit = abs(target_width - max([self.calculate_text_dimensions(line, font)[0] for line in lines]))
-                height_fit = abs(target_height - total_height)
-                fit_score = width_fit + height_fit * 2  # 高さを重視
-
-                if fit_score < best_fit_score and total_height <= target_height:
-                    best_fit_score = fit_score
-                    best_size = size
+                fits = max_width <= target_width and total_height <= target_height
 
             except Exception as e:
                 self.logger.warning(f"フォントサイズ {size} の計算に失敗: {e}")
-                continue
+                fits = False
+
+            if fits:
+                best_size = size
+                low = size + 1
+            else:
+                high = size - 1
 
         return best_size
 
-    def extract_dominant_color(self, image: np.ndarray, bbox: List[List[int]],
+    def extract_dominant_color(self, image: np.ndarray, bbox: BBoxLike,
                              n_colors: int = 3) -> Tuple[int, int, int]:
         """
         指定領域から主要な色を抽出
 
+        n_colorsが1の場合は色ヒストグラムの最頻ビン、2以上の場合はK-meansで
+        最も大きいクラスタの色を返す
+
         Args:
             image: 入力画像
-            bbox: バウンディングボックス [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
-            n_colors: 抽出する色の数
+            bbox: バウンディングボックス（4点またはAxisAlignedBBox）
+            n_colors: クラスタリングする色の数
 
         Returns:
             主要な色 (R, G, B)
         """
         try:
-            # バウンディングボックスから矩形領域を抽出
-            points = np.array(bbox, dtype=np.int32)
-            x_coords = points[:, 0]
-            y_coords = points[:, 1]
-
-            x_min, x_max = np.min(x_coords), np.max(x_coords)
-            y_min, y_max = np.min(y_coords), np.max(y_coords)
-
-            # 領域を切り抜き
-            region = image[y_min:y_max, x_min:x_max]
-
-            # リサンプリングしてピクセルを収集
-            small_region = cv2.resize(region, (50, 50))
-            pixels = small_region.reshape(-1, 3)
-
-            # K-meansクラスタリングで主要な色を抽出
-            kmeans = KMeans(n_clusters=min(n_colors, len(pixels)), random_state=42, n_init=10)
-            kmeans.fit(pixels)
+            # バウンディングボックスから矩形領域を切り抜き
+            box = normalize_bbox(bbox)
+            region = image[box.y_min:box.y_max, box.x_min:box.x_max]
+
+            if region.size == 0:
+                raise ValueError(f"領域が空です: {box}")
+
+            # 各辺がおよそ50ピクセルになるよう間引いてピクセルを収集（補間は行わない）
+            h, w = region.shape[:2]
+            step_y = max(1, h // 50)
+            step_x = max(1, w // 50)
+            pixels = region[::step_y, ::step_x].reshape(-1, 3)
+
+            if n_colors <= 1:
+                # 各チャンネル5ビットに量子化したヒストグラムの最頻ビンを求め、
+                # そのビンに含まれるピクセルの平均色を返す
+                quantized = (pixels >> 3).astype(np.int32)
+                bins = (quantized[:, 0] << 10) | (quantized[:, 1] << 5) | quantized[:, 2]
+                top_bin = np.bincount(bins, minlength=1 << 15).argmax()
+                color = pixels[bins == top_bin].mean(axis=0).astype(int)
+                return tuple(int(c) for c in color)
+
+            # K-meansクラスタリングで主要な色を抽出（Numbaがあれば3次元専用の実装を使用）
+            n_clusters = min(n_colors, len(pixels))
+            if HAS_NUMBA:
+                centers, labels = kmeans3(pixels.astype(np.float64), n_clusters)
+            else:
+                kmeans = MiniBatchKMeans(n_clusters=n_clusters, random_state=42,
+                                         n_init=1, batch_size=256)
+                labels = kmeans.fit_predict(pixels)
+                centers = kmeans.cluster_centers_
 
-            # 最も頻度の高いクラスタ中心を返す
-            colors = kmeans.cluster_centers_.astype(int)
-            return tuple(colors[0])  # 最初のクラスタ中心を返す
+            # 最も多くのピクセルが属するクラスタ中心を返す
+            largest = np.bincount(labels).argmax()
+            return tuple(int(c) for c in centers[largest])
 
         except Exception as e:
             self.logger.error(f"色抽出エラー: {e}")
             return (0, 0, 0)  # デフォルト: 黒
 
     def render_text_with_outline(self, image: np.ndarray, text: str, position: Tuple[int, int],
-                              bbox: List[List[int]], text_color: Tuple[int, int, int] = (0, 0, 0),
+                              bbox: BBoxLike, text_color: Tuple[int, int, int] = (0, 0, 0),
                               outline_color: Tuple[int, int, int] = (255, 255, 255),
                               outline_width: int = 2, font_size: int = None, auto_fit: bool = True) -> np.ndarray:
         """
@@ -229,63 +441,121 @@ class TextRenderer:
             テキストが描画された画像
         """
         try:
-            # PIL画像に変換
-            pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
-            draw = ImageDraw.Draw(pil_image)
-
-            # バウンディングボックスの寸法を計算
-            points = np.array(bbox, dtype=np.int32)
-            x_coords = points[:, 0]
-            y_coords = points[:, 1]
-            bbox_width = np.max(x_coords) - np.min(x_coords)
-            bbox_height = np.max(y_coords) - np.min(y_coords)
-
-            # フォントサイズの設定
-            if auto_fit:
-                target_width = bbox_width - outline_width * 2  # 縁取り分の余白
-                target_height = bbox_height - outline_width * 2
-                font_size = self.find_optimal_font_size(text, target_width, target_height)
-
-            # フォントの設定
-            if font_size:
-                self.set_font_size(font_size)
-
-            # テキストの折り返し
-            if auto_fit:
-                target_width = bbox_width - outline_width * 2
-                lines = self.wrap_text(text, target_width, self.font)
-            else:
-                lines = [text]
-
-            # 縁取りテキスト描画
-            y_offset = 0
-            for line in lines:
-                # 縁取りを描画（8方向にオフセットして描画）
-                for dx in [-outline_width, 0, outline_width]:
-                    for dy in [-outline_width, 0, outline_width]:
-                        if dx == 0 and dy == 0:
-                            continue  # 中心はスキップ
-                        draw.text((position[0] + dx, position[1] + y_offset + dy), line,
-                                 fill=outline_color, font=self.font)
-
-                # メインのテキストを描画
-                draw.text((position[0], position[1] + y_offset), line,
-                         fill=text_color, font=self.font)
-
-                # 行間を計算
-                line_height = self.calculate_text_dimensions(line, self.font)[1]
-                y_offset += line_height + 1  # 少しの行間
-
-            # numpy配列に戻す
-            result = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+            result = image.copy()
+            masks = self._layout_text_masks(text, position, bbox, text_color, outline_color,
+                                            outline_width, font_size, auto_fit)
+
+            if not masks:
+                return result
+
+            # テキストが描画される範囲だけをPIL画像にして描画し、元の画像に書き戻す
+            height, width = image.shape[:2]
+            x0 = max(0, min(x for (x, _), _, _ in masks))
+            y0 = max(0, min(y for (_, y), _, _ in masks))
+            x1 = min(width, max(x + mask.width for (x, _), mask, _ in masks))
+            y1 = min(height, max(y + mask.height for (_, y), mask, _ in masks))
+            if x1 <= x0 or y1 <= y0:
+                return result
+
+            # BGRのままPIL画像にし、色の並びを逆にして描画する（色空間の変換を行わない）
+            patch = Image.fromarray(result[y0:y1, x0:x1])
+            draw = ImageDraw.Draw(patch)
+            for (x, y), mask, fill in masks:
+                draw.bitmap((x - x0, y - y0), mask, fill=tuple(fill[::-1]))
+
+            result[y0:y1, x0:x1] = np.asarray(patch)
             return result
 
         except Exception as e:
             self.logger.error(f"縁取りテキスト描画エラー: {e}")
             return image.copy()
 
+    def _draw_text_with_outline(self, draw: ImageDraw.ImageDraw, text: str, position: Tuple[int, int],
+                                bbox: BBoxLike, text_color: Tuple[int, int, int],
+                                outline_color: Tuple[int, int, int], outline_width: int,
+                                font_size: int = None, auto_fit: bool = True):
+        """
+        PILの描画オブジェクトに縁取り付きテキストを描画
+
+        Args:
+            draw: 描画先のImageDraw（BGR画像をそのままPIL画像にしたもの）
+            text: 描画するテキスト
+            position: 描画位置 (x, y)
+            bbox: バウンディングボックス（自動フィット用）
+            text_color: テキスト色 (R, G, B)
+            outline_color: 縁取り色 (R, G, B)
+            outline_width: 縁取りの太さ
+            font_size: フォントサイズ
+            auto_fit: 自動サイズ調整を行うかどうか
+        """
+        for xy, mask, fill in self._layout_text_masks(text, position, bbox, text_color, outline_color,
+                                                      outline_width, font_size, auto_fit):
+            draw.bitmap(xy, mask, fill=tuple(fill[::-1]))  # BGRの並びで描画
+
+    def _layout_text_masks(self, text: str, position: Tuple[int, int], bbox: BBoxLike,
+                           text_color: Tuple[int, int, int], outline_color: Tuple[int, int, int],
+                           outline_width: int, font_size: int = None,
+                           auto_fit: bool = True) -> List[Tuple[Tuple[int, int], Image.Image, Tuple[int, int, int]]]:
+        """
+        縁取り付きテキストを描画するためのマスクを、貼り付ける順に並べて返す
+
+        Args:
+            text: 描画するテキスト
+            position: 描画位置 (x, y)
+            bbox: バウンディングボックス（自動フィット用）
+            text_color: テキスト色 (R, G, B)
+            outline_color: 縁取り色 (R, G, B)
+            outline_width: 縁取りの太さ
+            font_size: フォントサイズ
+            auto_fit: 自動サイズ調整を行うかどうか
+
+        Returns:
+            (貼り付け位置 (x, y), マスク画像, 色) のリスト
+        """
+        # バウンディングボックスの寸法を計算
+        box = normalize_bbox(bbox)
+        bbox_width = box.width
+        bbox_height = box.height
+
+        # フォントサイズの設定
+        if auto_fit:
+            target_width = bbox_width - outline_width * 2  # 縁取り分の余白
+            target_height = bbox_height - outline_width * 2
+            font_size = self.find_optimal_font_size(text, target_width, target_height)
+
+        # フォントの設定
+        if font_size:
+            self.set_font_size(font_size)
+
+        # テキストの折り返し
+        if auto_fit:
+            target_width = bbox_width - outline_width * 2
+            lines = self.wrap_text(text, target_width, self.font)
+        else:
+            lines = [text]
+
+        # 行の高さはフォントごとに一定なので描画前に1回だけ求める
+        line_height = self._line_height(self.font)
+
+        masks = []
+        y_offset = 0
+        for line in lines:
+            x, y = position[0], position[1] + y_offset
+            # 縁取り（FreeTypeのストローカーで1回でラスタライズ）→メインのテキストの順に貼り付ける
+            # （draw.textでstroke_widthを指定した場合と同じ結果になる）
+            if outline_width > 0:
+                (dx, dy), mask = self._get_line_mask(self.font, line, outline_width)
+                masks.append(((x + dx, y + dy), mask, outline_color))
+            if outline_width <= 0 or text_color != outline_color:
+                (dx, dy), mask = self._get_line_mask(self.font, line, 0)
+                masks.append(((x + dx, y + dy), mask, text_color))
+
+            y_offset += line_height + 1  # 少しの行間
+
+        return masks
+
     def render_text(self, image: np.ndarray, text: str, position: Tuple[int, int],
-                   bbox: List[List[int]], color: Tuple[int, int, int] = None,
+                   bbox: BBoxLike, color: Tuple[int, int, int] = None,
                    font_size: int = None, auto_fit: bool = True) -> np.ndarray:
         """
         画像にテキストを描画（縁取り付き）
@@ -307,7 +577,7 @@ class TextRenderer:
         outline_color = (255, 255, 255)  # 白
         return self.render_text_with_outline(image, text, position, bbox, text_color, outline_color, 2, font_size, auto_fit)
 
-    def render_text_centered(self, image: np.ndarray, text: str, bbox: List[List[int]],
+    def render_text_centered(self, image: np.ndarray, text: str, bbox: BBoxLike,
                            color: Tuple[int, int, int] = None) -> np.ndarray:
         """
         バウンディングボックスの左上からテキストを描画（元のテキスト位置に合わせる）
@@ -322,17 +592,9 @@ class TextRenderer:
             テキストが描画された画像
         """
         try:
-            # バウンディングボックスの左上座標を計算
-            points = np.array(bbox, dtype=np.int32)
-            x_coords = points[:, 0]
-            y_coords = points[:, 1]
-
-            # 左上座標を取得（若干のマージンを加える）
-            top_left_x = int(np.min(x_coords)) + 2
-            top_left_y = int(np.min(y_coords)) + 2
-
             # 左上から描画
-            result = self.render_text(image, text, (top_left_x, top_left_y), bbox, color)
+            box = normalize_bbox(bbox)
+            result = self.render_text(image, text, self._top_left_position(box), box, color)
 
             return result
 
@@ -340,6 +602,20 @@ class TextRenderer:
             self.logger.error(f"テキスト描画エラー: {e}")
             return image.copy()
 
+    @staticmethod
+    def _top_left_position(bbox: BBoxLike) -> Tuple[int, int]:
+        """
+        バウンディングボックスの左上座標（若干のマージンを加える）を計算
+
+        Args:
+            bbox: バウンディングボックス
+
+        Returns:
+            描画位置 (x, y)
+        """
+        box = normalize_bbox(bbox)
+        return box.x_min + 2, box.y_min + 2
+
     def batch_render_text(self, image: np.ndarray, text_data: List[Dict[str, Any]]) -> np.ndarray:
         """
         複数のテキストを一括で描画
@@ -348,32 +624,31 @@ class TextRenderer:
             image: 入力画像
             text_data: テキストデータのリスト。各要素は以下のキーを含む:
                 - 'text': 描画するテキスト
-                - 'bbox': バウンディングボックス
+                - 'bbox': バウンディングボックス（4点またはAxisAlignedBBox）
                 - 'color': テキスト色（オプション）
                 - 'position': 描画位置（オプション）
 
         Returns:
             テキストが描画された画像
         """
-        result = image.copy()
+        # BGRの配列をそのままPIL画像にし（色空間の変換は行わない）、全てのテキストを同じ画像に描画する
+        pil_image = Image.fromarray(image)
+        draw = ImageDraw.Draw(pil_image)
 
         for data in text_data:
             try:
                 text = data['text']
-                bbox = data['bbox']
-                color = data.get('color')
-                position = data.get('position')
+                bbox = normalize_bbox(data['bbox'])
+                position = data.get('position') or self._top_left_position(bbox)
 
-                if position:
-                    result = self.render_text(result, text, position, bbox, color)
-                else:
-                    result = self.render_text_centered(result, text, bbox, color)
+                # render_textと同じく黒いテキストに白い縁取りで描画
+                self._draw_text_with_outline(draw, text, position, bbox, (0, 0, 0), (255, 255, 255), 2)
 
             except Exception as e:
                 self.logger.error(f"バッチ描画エラー: {e}")
                 continue
 
-        return result
+        return np.array(pil_image)
 
 
 def create_renderer(font_path: str = None, default_font_size: int = 12) -> TextRenderer:
@@ -392,22 +667,47 @@ def create_renderer(font_path: str = None, default_font_size: int = 12) -> TextR
 
 if __name__ == "__main__":
     # テスト用コード
+    import argparse
+
+    parser = argparse.ArgumentParser(description="テキスト描画のテスト")
+    parser.add_argument('--fast', action='store_true',
+                        help="結果をPNGではなくJPEG（品質85）で保存する")
+    parser.add_argument('--profile', action='store_true',
+                        help="cProfileでプロファイルを取り、test_text_render.profに保存する")
+    args = parser.parse_args()
+
     logging.basicConfig(level=logging.INFO)
 
-    # テスト用画像
-    test_image = np.ones((300, 400, 3), dtype=np.uint8) * 255  # 白い背景
+    def run_demo():
+        # テスト用画像
+        test_image = np.full((300, 400, 3), 255, dtype=np.uint8)  # 白い背景
+
+        # テスト用バウンディングボックス
+        test_bbox = [[50, 50], [200, 50], [200, 100], [50, 100]]
+
+        # レンダラーの作成
+        renderer = create_renderer(BUNDLED_FONT_PATH)
 
-    # テスト用バウンディングボックス
-    test_bbox = [[50, 50], [200, 50], [200, 100], [50, 100]]
+        # テキスト描画テスト
+        test_text = "これはテスト用の日本語テキストです。"
+        result = renderer.render_text_centered(test_image, test_text, test_bbox)
 
-    # レンダラーの作成
-    renderer = create_renderer()
+        # 結果保存
+        if args.fast:
+            cv2.imwrite("test_text_render.jpg", result, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        else:
+            cv2.imwrite("test_text_render.png", result, [cv2.IMWRITE_PNG_COMPRESSION, 1])
 
-    # テキスト描画テスト
-    test_text = "これはテスト用の日本語テキストです。"
-    result = renderer.render_text_centered(test_image, test_text, test_bbox)
+    if args.profile:
+        import cProfile
+        import pstats
 
-    # 結果保存
-    cv2.imwrite("test_text_render.png", result)
+        profiler = cProfile.Profile()
+        profiler.runcall(run_demo)
+        profiler.dump_stats("test_text_render.prof")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+        print("プロファイルを保存しました: test_text_render.prof（snakeviz test_text_render.prof で可視化できます）")
+    else:
+        run_demo()
 
-    print("テキスト描画テスト完了")
\ No newline at end of file
+    print("テキスト描画テスト完了")
@@ -2,27 +2,114 @@
 翻訳モジュール - Google Gemini APIを使用したテキスト翻訳機能
 """
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 import os
+import time
 import logging
 import json
-from typing import List, Optional, Dict, Any
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from contextlib import closing
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional, Dict, Any, Set
+from cachetools import LRUCache
 from dotenv import load_dotenv
 
+# 1回のバルク翻訳リクエストに含めるテキスト数
+BULK_CHUNK_SIZE = 50
+# 同時に送信するバルク翻訳リクエストの数
+BULK_MAX_WORKERS = 4
+# レート制限（429）時の再試行回数とリクエスト間隔の上限（秒）
+RATE_LIMIT_MAX_RETRIES = 5
+RATE_LIMIT_MAX_INTERVAL = 60.0
+# 日本語を表す目的言語名（既に日本語のテキストは翻訳しない）
+JAPANESE_LANGUAGE_NAMES = {'japanese', 'ja', '日本語'}
+# 文字のうち仮名・漢字がこの割合以上なら日本語のテキストとみなす
+JAPANESE_TEXT_RATIO = 0.9
+
+# 単一テキスト翻訳のプロンプト（ソース言語の指定あり/なし）
+# "Translate the following {src} text to {tgt}. Return ONLY the translated text, nothing else. If the text is already in {tgt}, translate it again: \"{text}\""
+_TRANSLATE_PROMPT_TMPL = "あなたは、{src}から{tgt}への翻訳者です。以下のテキストを必ず{tgt}に翻訳してください。翻訳結果のみを返してください。他の情報は一切含めないでください。もしテキストが既に{tgt}で書かれている場合でも、再度翻訳してください: \"{text}\""
+_TRANSLATE_PROMPT_AUTO_TMPL = "あなたは、任意の言語から{tgt}への翻訳者です。以下のテキストを必ず{tgt}に翻訳してください。翻訳結果のみを返してください。他の情報は一切含めないでください。もしテキストが既に{tgt}で書かれている場合でも、再度翻訳してください: \"{text}\""
+
+# バルク翻訳のプロンプト（payloadにリクエストJSONを埋め込む）
+_BULK_PROMPT_TMPL = """あなたはプロの翻訳者です。以下のJSONデータに含まれるすべてのテキストを{tgt}に翻訳してください。
+コンテキスト情報を考慮して、一貫性のある翻訳を心がけてください。各テキストの文脈やニュアンスを保持しつつ、自然な{tgt}表現に翻訳してください。
+
+以下のJSON形式で応答してください:
+```json
+{{
+  "request_type": "bulk_translation_response",
+  "translations": [
+    {{
+      "id": 1,
+      "original_text": "元のテキスト",
+      "translated_text": "翻訳されたテキスト",
+      "confidence": 0.95
+    }}
+  ]
+}}
+```
+
+翻訳対象データ:
+```json
+{payload}
+```
+
+重要: 上記のJSON形式のみで応答してください。他の説明やテキストは含めないでください。"""
+
+# バルク翻訳のレスポンス形式（JSONモードでこのスキーマに沿ったJSONのみを返させる）
+_BULK_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "request_type": {"type": "STRING"},
+        "translations": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "id": {"type": "INTEGER"},
+                    "original_text": {"type": "STRING"},
+                    "translated_text": {"type": "STRING"},
+                    "confidence": {"type": "NUMBER"}
+                },
+                "required": ["id", "translated_text"]
+            }
+        }
+    },
+    "required": ["request_type", "translations"]
+}
+_BULK_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": _BULK_RESPONSE_SCHEMA
+}
+
+
 class GeminiTranslator:
     """Google Gemini APIを使用した翻訳クラス"""
 
-    def __init__(self, api_key: str = None, model_name: str = 'gemini-2.0-flash'):
+    def __init__(self, api_key: str = None, model_name: str = 'gemini-2.0-flash',
+                 cache_path: str = None):
         """
         初期化
 
         Args:
             api_key: Gemini APIキー（Noneの場合は環境変数から取得）
             model_name: 使用するモデル名
+            cache_path: 翻訳結果を永続化するSQLiteファイルのパス（Noneの場合はメモリのみ）
         """
         self.model_name = model_name
         self.model = None
         self.logger = logging.getLogger(__name__)
 
+        # リクエスト間隔の制御（429を受け取るまでは待たない）
+        self._rate_lock = threading.Lock()
+        self._min_interval = 0.0
+        self._next_ok_time = 0.0
+
         # 環境変数の読み込み
         load_dotenv()
 
@@ -37,17 +124,215 @@ class GeminiTranslator:
 
         self._initialize_model()
 
-  
+        # 翻訳結果のキャッシュ（(text, target_language, source_language)をキーとする）
+        # メモリ上のLRUを優先し、見つからない場合はcache_pathのSQLiteを参照する
+        self._memory_cache: LRUCache = LRUCache(maxsize=16384)
+        self._cache_lock = threading.Lock()
+        self.cache_path = cache_path
+        if cache_path:
+            self._initialize_cache_db()
+
     def _initialize_model(self):
         """Geminiモデルの初期化"""
         try:
-            genai.configure(api_key=self.api_key)
+            # gRPCの通信はeventletでパッチされたスレッドに処理を譲らないため、RESTで通信する
+            # （_translate_chunksの並列リクエストが実際に重なるようにする）
+            genai.configure(api_key=self.api_key, transport='rest')
             self.model = genai.GenerativeModel(self.model_name)
             self.logger.info(f"Geminiモデル '{self.model_name}' を初期化しました")
         except Exception as e:
             self.logger.error(f"Geminiモデルの初期化に失敗: {e}")
             raise
 
+    def _wait_for_slot(self):
+        """前回のリクエストから_min_interval秒経過するまで待機"""
+        with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_ok_time - now
+            self._next_ok_time = max(now, self._next_ok_time) + self._min_interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def _generate(self, prompt: str, generation_config: Dict[str, Any] = None):
+        """
+        レート制限を考慮してgenerate_contentを呼び出す
+
+        429（TooManyRequests、gRPCのResourceExhaustedを含む）を受け取った場合はリクエスト間隔を倍にして再試行し、
+        成功するたびに間隔を半分に戻す
+
+        Args:
+            prompt: プロンプト
+            generation_config: リクエストごとの生成設定（オプション）
+
+        Returns:
+            Geminiのレスポンス
+        """
+        for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+            self._wait_for_slot()
+            try:
+                response = self.model.generate_content(prompt, generation_config=generation_config)
+            except google_exceptions.TooManyRequests:
+                if attempt == RATE_LIMIT_MAX_RETRIES:
+                    raise
+                with self._rate_lock:
+                    self._min_interval = min(RATE_LIMIT_MAX_INTERVAL, max(1.0, self._min_interval * 2))
+                    self._next_ok_time = time.monotonic() + self._min_interval
+                self.logger.warning(f"レート制限に達しました。{self._min_interval:.1f}秒間隔で再試行します")
+                continue
+
+            with self._rate_lock:
+                self._min_interval = self._min_interval / 2 if self._min_interval >= 0.5 else 0.0
+            return response
+
+    @staticmethod
+    def _needs_translation(text: str, target_language: str, source_language: str = None) -> bool:
+        """
+        テキストをAPIに送って翻訳する必要があるかを判定
+
+        文字を含まないテキスト（記号・数字のみのOCRノイズなど）と、
+        目的言語が日本語で既に日本語のテキストは翻訳不要とする
+
+        Args:
+            text: テキスト
+            target_language: 目的言語
+            source_language: ソース言語（指定時は日本語判定を行わない）
+
+        Returns:
+            翻訳が必要な場合True
+        """
+        letters = [c for c in text if c.isalpha()]
+        if not letters:
+            return False
+
+        if source_language or target_language.strip().lower() not in JAPANESE_LANGUAGE_NAMES:
+            return True
+
+        # 中国語などを誤って除外しないよう、仮名を含む場合のみ日本語とみなす
+        has_kana = False
+        japanese = 0
+        for c in letters:
+            name = unicodedata.name(c, '')
+            if name.startswith(('HIRAGANA', 'KATAKANA')):
+                has_kana = True
+                japanese += 1
+            elif name.startswith('CJK'):
+                japanese += 1
+        return not (has_kana and japanese >= len(letters) * JAPANESE_TEXT_RATIO)
+
+    def _connect_cache_db(self) -> sqlite3.Connection:
+        """翻訳キャッシュDBへの接続を作成"""
+        return sqlite3.connect(self.cache_path, timeout=10)
+
+    def _initialize_cache_db(self):
+        """翻訳キャッシュDBの初期化（失敗した場合はメモリキャッシュのみ使用）"""
+        try:
+            cache_dir = os.path.dirname(self.cache_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            with closing(self._connect_cache_db()) as conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS translation_cache ('
+                    ' text_hash TEXT NOT NULL,'
+                    ' target_language TEXT NOT NULL,'
+                    ' source_language TEXT NOT NULL,'
+                    ' translated_text TEXT NOT NULL,'
+                    ' created_at TEXT NOT NULL,'
+                    ' PRIMARY KEY (text_hash, target_language, source_language))'
+                )
+                conn.commit()
+        except Exception as e:
+            self.logger.error(f"翻訳キャッシュ初期化エラー: {e}")
+            self.cache_path = None
+
+    @staticmethod
+    def _text_hash(text: str) -> str:
+        """キャッシュキーに使用するテキストのハッシュ"""
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def _get_cached_translations(self, texts: List[str], target_language: str,
+                                 source_language: str = None) -> Dict[str, str]:
+        """
+        キャッシュ済みの翻訳結果を取得（メモリ → SQLiteの順に参照）
+
+        Args:
+            texts: テキストのリスト
+            target_language: 目的言語
+            source_language: ソース言語
+
+        Returns:
+            原文をキーとした翻訳結果の辞書（キャッシュにあるもののみ）
+        """
+        found = {}
+        missing = []
+        with self._cache_lock:
+            for text in texts:
+                translated = self._memory_cache.get((text, target_language, source_language))
+                if translated is not None:
+                    found[text] = translated
+                else:
+                    missing.append(text)
+
+        if not missing or not self.cache_path:
+            return found
+
+        try:
+            hashes = {self._text_hash(text): text for text in missing}
+            with closing(self._connect_cache_db()) as conn:
+                hash_list = list(hashes)
+                # SQLiteのパラメータ数上限を超えないよう分割して問い合わせる
+                for start in range(0, len(hash_list), 500):
+                    batch = hash_list[start:start + 500]
+                    rows = conn.execute(
+                        'SELECT text_hash, translated_text FROM translation_cache'
+                        ' WHERE target_language = ? AND source_language = ?'
+                        f' AND text_hash IN ({",".join("?" * len(batch))})',
+                        (target_language, source_language or '', *batch)
+                    ).fetchall()
+                    for text_hash, translated in rows:
+                        found[hashes[text_hash]] = translated
+
+            with self._cache_lock:
+                for text in missing:
+                    if text in found:
+                        self._memory_cache[(text, target_language, source_language)] = found[text]
+        except Exception as e:
+            self.logger.error(f"翻訳キャッシュ読み込みエラー: {e}")
+
+        return found
+
+    def _put_cached_translations(self, translations: Dict[str, str], target_language: str,
+                                 source_language: str = None):
+        """
+        翻訳結果をキャッシュに保存
+
+        Args:
+            translations: 原文をキーとした翻訳結果の辞書
+            target_language: 目的言語
+            source_language: ソース言語
+        """
+        if not translations:
+            return
+
+        with self._cache_lock:
+            for text, translated in translations.items():
+                self._memory_cache[(text, target_language, source_language)] = translated
+
+        if not self.cache_path:
+            return
+
+        try:
+            now = datetime.now().isoformat()
+            with closing(self._connect_cache_db()) as conn:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO translation_cache VALUES (?, ?, ?, ?, ?)',
+                    [(self._text_hash(text), target_language, source_language or '', translated, now)
+                     for text, translated in translations.items()]
+                )
+                conn.commit()
+        except Exception as e:
+            self.logger.error(f"翻訳キャッシュ保存エラー: {e}")
+
     def translate_text(self, text: str, target_language: str = "Japanese", source_language: str = None) -> str:
         """
         単一のテキストを翻訳
@@ -62,30 +347,48 @@ class GeminiTranslator:
         """
         if not text.strip():
             return ""
+        if not self._needs_translation(text, target_language, source_language):
+            return text
 
-        try:
-            # プロンプトの作成（より明確な指示）
-            if source_language:
-                # prompt = f"Translate the following {source_language} text to {target_language}. Return ONLY the translated text, nothing else. If the text is already in {target_language}, translate it again: \"{text}\""
-                prompt = f"あなたは、{source_language}から{target_language}への翻訳者です。以下のテキストを必ず{target_language}に翻訳してください。翻訳結果のみを返してください。他の情報は一切含めないでください。もしテキストが既に{target_language}で書かれている場合でも、再度翻訳してください: \"{text}\""
-            else:
-                # prompt = f"Translate the following text to {target_language}. Return ONLY the translated text, nothing else. If the text is already in {target_language}, translate it again: \"{text}\""
-                prompt = f"あなたは、任意の言語から{target_language}への翻訳者です。以下のテキストを必ず{target_language}に翻訳してください。翻訳結果のみを返してください。他の情報は一切含めないでください。もしテキストが既に{target_language}で書かれている場合でも、再度翻訳してください: \"{text}\""
-
-            # 翻訳実行
-            response = self.model.generate_content(prompt)
-            translated_text = response.text.strip()
-
-            # デバッグログ
-            self.logger.info(f"翻訳結果: '{text}' -> '{translated_text}'")
+        cached = self._get_cached_translations([text], target_language, source_language)
+        if text in cached:
+            return cached[text]
 
+        try:
+            translated_text = self._translate_uncached(text, target_language, source_language)
+            self._put_cached_translations({text: translated_text}, target_language, source_language)
             return translated_text
-
         except Exception as e:
             self.logger.error(f"翻訳エラー ({text}): {e}")
             return text  # エラー時は原文を返す
 
-  
+    def _translate_uncached(self, text: str, target_language: str, source_language: str = None) -> str:
+        """
+        APIを呼び出して単一のテキストを翻訳（エラーは呼び出し元に送出する）
+
+        Args:
+            text: 翻訳するテキスト
+            target_language: 目的言語
+            source_language: ソース言語（Noneの場合は自動検出）
+
+        Returns:
+            翻訳されたテキスト
+        """
+        # プロンプトの作成（より明確な指示）
+        if source_language:
+            prompt = _TRANSLATE_PROMPT_TMPL.format(src=source_language, tgt=target_language, text=text)
+        else:
+            prompt = _TRANSLATE_PROMPT_AUTO_TMPL.format(tgt=target_language, text=text)
+
+        # 翻訳実行
+        response = self._generate(prompt)
+        translated_text = response.text.strip()
+
+        # デバッグログ
+        self.logger.info(f"翻訳結果: '{text}' -> '{translated_text}'")
+
+        return translated_text
+
     def bulk_translate_json(self, texts: List[str], target_language: str = "Japanese",
                           source_language: str = None, contexts: List[str] = None) -> Dict[str, Any]:
         """
@@ -107,6 +410,21 @@ class GeminiTranslator:
                 "error": "No texts provided"
             }
 
+        # 翻訳不要なテキストはAPIに送らず原文をそのまま結果とする
+        passthrough = []
+        needed = []
+        for i, text in enumerate(texts):
+            if self._needs_translation(text, target_language, source_language):
+                needed.append(i)
+            else:
+                passthrough.append({"id": i + 1, "original_text": text, "translated_text": text, "confidence": 1.0})
+
+        if not needed:
+            return {
+                "request_type": "bulk_translation_response",
+                "translations": passthrough
+            }
+
         try:
             # リクエストJSONの構築
             request_data = {
@@ -116,7 +434,8 @@ class GeminiTranslator:
                 "texts": []
             }
 
-            for i, text in enumerate(texts):
+            for i in needed:
+                text = texts[i]
                 text_item = {
                     "id": i + 1,
                     "text": text
@@ -125,49 +444,25 @@ class GeminiTranslator:
                     text_item["context"] = contexts[i]
                 request_data["texts"].append(text_item)
 
-            # プロンプトの作成（JSON形式でバルク翻訳を要求）
-            prompt = f"""あなたはプロの翻訳者です。以下のJSONデータに含まれるすべてのテキストを{target_language}に翻訳してください。
-コンテキスト情報を考慮して、一貫性のある翻訳を心がけてください。各テキストの文脈やニュアンスを保持しつつ、自然な{target_language}表現に翻訳してください。
-
-以下のJSON形式で応答してください:
-```json
-{{
-  "request_type": "bulk_translation_response",
-  "translations": [
-    {{
-      "id": 1,
-      "original_text": "元のテキスト",
-      "translated_text": "翻訳されたテキスト",
-      "confidence": 0.95
-    }}
-  ]
-}}
-```
-
-翻訳対象データ:
-```json
-{json.dumps(request_data, ensure_ascii=False)}
-```
-
-重要: 上記のJSON形式のみで応答してください。他の説明やテキストは含めないでください。"""
+            # プロンプトの作成（JSON形式でバルク翻訳を要求、区切り文字を詰めてトークンを節約）
+            payload = json.dumps(request_data, ensure_ascii=False, separators=(',', ':'))
+            prompt = _BULK_PROMPT_TMPL.format(tgt=target_language, payload=payload)
 
             # バルク翻訳の実行
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
+            # JSONモードで実行するため、レスポンスはそのままパースできる
+            response = self._generate(prompt, generation_config=_BULK_GENERATION_CONFIG)
+            response_text = response.text
 
             # JSONレスポンスのパース
             try:
-                # コードブロックを除去
-                if response_text.startswith("```json"):
-                    response_text = response_text[7:]
-                if response_text.endswith("```"):
-                    response_text = response_text[:-3]
-
-                result_data = json.loads(response_text.strip())
+                result_data = json.loads(response_text)
 
                 # レスポンス形式の検証
                 if result_data.get("request_type") == "bulk_translation_response":
                     self.logger.info(f"バルク翻訳成功: {len(result_data.get('translations', []))}件")
+                    if passthrough:
+                        result_data["translations"] = result_data.get("translations", []) + passthrough
+                        self.logger.info(f"翻訳不要のためスキップ: {len(passthrough)}件")
                     return result_data
                 else:
                     self.logger.error(f"予期しないレスポンス形式: {result_data}")
@@ -194,7 +489,6 @@ class GeminiTranslator:
                 "error": str(e)
             }
 
-  
     def bulk_translate_simple(self, texts: List[str], target_language: str = "Japanese") -> List[str]:
         """
         シンプルなバルク翻訳 - テキストリストを受け取り翻訳リストを返す
@@ -206,15 +500,161 @@ class GeminiTranslator:
         Returns:
             翻訳されたテキストのリスト
         """
-        result = self.bulk_translate_json(texts, target_language)
+        return self.translate_texts(texts, target_language)
+
+    def translate_texts(self, texts: List[str], target_language: str = "Japanese",
+                        source_language: str = None, contexts: List[str] = None,
+                        chunk_size: int = BULK_CHUNK_SIZE, max_workers: int = BULK_MAX_WORKERS,
+                        progress_callback: Callable[[int, int], None] = None,
+                        failed: Set[str] = None) -> List[str]:
+        """
+        複数のテキストをchunk_size件ずつbulk_translate_jsonで翻訳
+
+        キャッシュ済みのテキストはAPIに送らず、同じテキストは1回だけ翻訳する。
+        チャンクが複数ある場合は最大max_workers件のリクエストを並列に送信する
+
+        Args:
+            texts: 翻訳するテキストのリスト
+            target_language: 目的言語
+            source_language: ソース言語（オプション）
+            contexts: 各テキストのコンテキスト情報（オプション）
+            chunk_size: 1回のリクエストに含めるテキスト数
+            max_workers: 同時に送信するリクエストの最大数
+            progress_callback: チャンクごとに翻訳が必要なテキストの (完了数, 総数) を受け取るコールバック（オプション）
+            failed: 翻訳に失敗したテキストを追加する集合（オプション、翻訳不要で原文のまま返したテキストは含まない）
+
+        Returns:
+            textsと同じ順序の翻訳結果（翻訳に失敗したテキストは原文）
+        """
+        cached = self._get_cached_translations(texts, target_language, source_language)
+
+        # キャッシュに無い翻訳が必要なテキストを重複を除いて集める（コンテキストは最初の出現のものを使用）
+        pending: Dict[str, Optional[str]] = {}
+        for i, text in enumerate(texts):
+            if text in cached or text in pending:
+                continue
+            if not self._needs_translation(text, target_language, source_language):
+                continue  # 翻訳不要なテキストは原文のまま返す
+            pending[text] = contexts[i] if contexts and i < len(contexts) else None
+
+        pending_texts = list(pending)
+        pending_contexts = list(pending.values()) if contexts else None
+        fresh = self._translate_chunks(pending_texts, target_language, source_language, pending_contexts,
+                                       chunk_size, max_workers, progress_callback)
+        self._put_cached_translations(fresh, target_language, source_language)
+        if failed is not None:
+            failed.update(text for text in pending_texts if text not in fresh)
+
+        if cached:
+            self.logger.info(f"翻訳キャッシュヒット: {len(cached)}件")
+        return [cached[text] if text in cached else fresh.get(text, text) for text in texts]
+
+    def _translate_chunks(self, texts: List[str], target_language: str, source_language: Optional[str],
+                          contexts: Optional[List[str]], chunk_size: int, max_workers: int,
+                          progress_callback: Optional[Callable[[int, int], None]]) -> Dict[str, str]:
+        """
+        テキストをチャンクに分割してbulk_translate_jsonで翻訳
 
-        if result.get("translations"):
-            # ID順に翻訳結果をソートして返す
-            sorted_translations = sorted(result["translations"], key=lambda x: x["id"])
-            return [t["translated_text"] for t in sorted_translations]
+        Returns:
+            原文をキーとした翻訳結果の辞書（翻訳に成功したもののみ）
+        """
+        translated: Dict[str, str] = {}
+        total = len(texts)
+        starts = list(range(0, total, chunk_size))
+
+        def translate_chunk(start: int) -> Dict[str, Any]:
+            chunk_contexts = contexts[start:start + chunk_size] if contexts else None
+            return self.bulk_translate_json(texts[start:start + chunk_size], target_language,
+                                            source_language=source_language, contexts=chunk_contexts)
+
+        def merge_chunk(start: int, result: Dict[str, Any]):
+            chunk_length = min(chunk_size, total - start)
+            for item in result.get("translations", []):
+                index = item.get("id")
+                if isinstance(index, int) and 1 <= index <= chunk_length and "translated_text" in item:
+                    translated[texts[start + index - 1]] = item["translated_text"]
+
+        done = 0
+        if max_workers <= 1 or len(starts) <= 1:
+            for start in starts:
+                merge_chunk(start, translate_chunk(start))
+                done += min(chunk_size, total - start)
+                if progress_callback:
+                    progress_callback(done, total)
         else:
-            # エラー時は原文を返す
-            return texts
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(starts))) as executor:
+                futures = {executor.submit(translate_chunk, start): start for start in starts}
+                for future in as_completed(futures):
+                    start = futures[future]
+                    merge_chunk(start, future.result())
+                    done += min(chunk_size, total - start)
+                    if progress_callback:
+                        progress_callback(done, total)
+
+        return translated
+
+    def batch_translate_with_progress(self, texts: List[str], target_language: str = "Japanese",
+                                      progress_callback: Callable[[int, int], None] = None) -> List[str]:
+        """
+        進捗を通知しながら複数のテキストを翻訳
+
+        Args:
+            texts: 翻訳するテキストのリスト
+            target_language: 目的言語
+            progress_callback: (完了数, 総数) を受け取るコールバック
+
+        Returns:
+            翻訳されたテキストのリスト
+        """
+        return self.translate_texts(texts, target_language, progress_callback=progress_callback)
+
+    def translate_texts_grouped(self, text_groups: List[List[str]], target_language: str = "Japanese",
+                                source_language: str = None,
+                                context_groups: List[List[str]] = None,
+                                failed: Set[str] = None) -> List[List[str]]:
+        """
+        グループ化されたテキスト（画像ごとのテキストなど）をまとめて翻訳（BULK_CHUNK_SIZE件ごとに1回のAPIコール）
+
+        全グループのテキストを1つのリストにまとめてtranslate_textsに渡し、
+        結果を元のグループ構造に戻す。
+
+        Args:
+            text_groups: テキストのリストのリスト
+            target_language: 目的言語
+            source_language: ソース言語（オプション）
+            context_groups: text_groupsと同じ構造のコンテキスト情報（オプション）
+            failed: 翻訳に失敗したテキストを追加する集合（オプション）
+
+        Returns:
+            text_groupsと同じ構造の翻訳結果（翻訳に失敗したテキストは原文）
+        """
+        flat_texts = []
+        flat_contexts = []
+        for group_index, texts in enumerate(text_groups):
+            contexts = context_groups[group_index] if context_groups else []
+            for item_index, text in enumerate(texts):
+                flat_texts.append(text)
+                # どの画像のどの領域かをコンテキストに含める
+                marker = f"画像{group_index + 1}-{item_index + 1}"
+                if item_index < len(contexts):
+                    marker = f"{marker} {contexts[item_index]}"
+                flat_contexts.append(marker)
+
+        if not flat_texts:
+            return [[] for _ in text_groups]
+
+        translated = self.translate_texts(flat_texts, target_language,
+                                          source_language=source_language, contexts=flat_contexts,
+                                          failed=failed)
+
+        grouped = []
+        offset = 0
+        for texts in text_groups:
+            grouped.append(translated[offset:offset + len(texts)])
+            offset += len(texts)
+
+        self.logger.info(f"グループ翻訳完了: {len(text_groups)}グループ, {len(flat_texts)}件")
+        return grouped
 
 
 def create_translator(api_key: str = None) -> GeminiTranslator:
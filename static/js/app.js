@@ -184,8 +184,10 @@ class ImageTranslationApp {
     cancelProcessing() {
         console.log('Cancel processing called');
         if (this.currentSessionId) {
-            console.log('Clearing session:', this.currentSessionId);
-            // セッションをクリア（サーバー側で処理を停止）
+            console.log('Cancelling session:', this.currentSessionId);
+            // サーバー側で処理を停止
+            fetch(`/api/session/${this.currentSessionId}/cancel`, { method: 'POST' })
+                .catch((error) => console.error('Cancel error:', error));
             this.currentSessionId = null;
         }
         this.stopProcessing();